@@ -27,6 +27,7 @@ ON CONFLICT (id) DO NOTHING;
 -- =========================
 \connect booking_db
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS btree_gist;
 
 CREATE TABLE IF NOT EXISTS hotels (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -37,24 +38,38 @@ CREATE TABLE IF NOT EXISTS hotels (
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
+CREATE INDEX IF NOT EXISTS ix_hotels_created_at_id ON hotels (created_at, id);
+
 CREATE TABLE IF NOT EXISTS rooms (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     hotel_id UUID NOT NULL REFERENCES hotels(id) ON DELETE CASCADE,
     room_number VARCHAR(50) NOT NULL,
     room_type INTEGER NOT NULL,
     price_per_night NUMERIC(10,2) NOT NULL,
-    img_url VARCHAR(500)
+    img_url VARCHAR(500),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
+CREATE INDEX IF NOT EXISTS ix_rooms_hotel_number_id ON rooms (hotel_id, room_number, id);
+
 CREATE TABLE IF NOT EXISTS bookings (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     user_id UUID NOT NULL,
     room_id UUID NOT NULL REFERENCES rooms(id) ON DELETE CASCADE,
     check_in_date DATE NOT NULL,
     check_out_date DATE NOT NULL,
-    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    CONSTRAINT ex_bookings_room_overlap EXCLUDE USING gist (
+        room_id WITH =,
+        daterange(check_in_date, check_out_date) WITH &&
+    )
 );
 
+CREATE INDEX IF NOT EXISTS ix_bookings_room_dates
+    ON bookings (room_id, check_in_date, check_out_date);
+CREATE INDEX IF NOT EXISTS ix_bookings_user_created_id
+    ON bookings (user_id, created_at, id);
+
 -- Seed test data (hotels & rooms)
 INSERT INTO hotels (id, name, location, description, img_url)
 VALUES
@@ -80,12 +95,46 @@ ON CONFLICT (id) DO NOTHING;
 -- =========================
 \connect logging_db
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
+-- Таблица секционирована по дням; секции на ближайшие дни и удаление
+-- устаревших выполняет logging_service
 CREATE TABLE IF NOT EXISTS logs (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    id UUID NOT NULL DEFAULT uuid_generate_v4(),
     level INTEGER NOT NULL,
     message VARCHAR(1000) NOT NULL,
     service_name VARCHAR(255) NOT NULL,
-    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
-);
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE IF NOT EXISTS logs_default PARTITION OF logs DEFAULT;
+
+DO $$
+DECLARE
+    day DATE;
+BEGIN
+    FOR day IN SELECT generate_series(CURRENT_DATE - 1, CURRENT_DATE + 7, INTERVAL '1 day')::date LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF logs FOR VALUES FROM (%L) TO (%L)',
+            'logs_p' || to_char(day, 'YYYYMMDD'),
+            day::timestamp AT TIME ZONE 'UTC',
+            (day + 1)::timestamp AT TIME ZONE 'UTC'
+        );
+    END LOOP;
+END
+$$;
+
+CREATE INDEX IF NOT EXISTS ix_logs_created_at_id ON logs (created_at, id);
+CREATE INDEX IF NOT EXISTS ix_logs_service_created_at_id ON logs (service_name, created_at, id);
+-- Поиск подстроки в сообщениях (GET /logs?q=)
+CREATE INDEX IF NOT EXISTS ix_logs_message_trgm ON logs USING gin (message gin_trgm_ops);
 
+-- Поминутные счётчики логов по сервису и уровню (GET /logs/stats)
+CREATE TABLE IF NOT EXISTS log_rollups (
+    bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+    service_name VARCHAR(255) NOT NULL,
+    level INTEGER NOT NULL,
+    count BIGINT NOT NULL,
+    PRIMARY KEY (bucket, service_name, level)
+);
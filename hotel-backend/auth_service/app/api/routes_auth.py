@@ -1,7 +1,8 @@
 """API маршруты для аутентификации."""
 
 import logging
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Any
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -9,7 +10,9 @@ from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.db.session import get_db
+from common.cache import TTLCache
 from common.models import User
 from app.schemas.user import (
     TokenResponse,
@@ -17,8 +20,8 @@ from app.schemas.user import (
     UserLogin,
     UserResponse,
 )
-from app.security.jwt import create_access_token, decode_access_token
-from app.security.password import hash_password, verify_password
+from app.security.jwt import create_access_token, decode_access_token_payload
+from app.security.password import hash_password_async, verify_password_async
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +30,72 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
 # Схема для Bearer токена
 security = HTTPBearer()
 
+# Кэш пользователей по id; сбрасывается при изменении и удалении пользователя
+user_cache: TTLCache[UUID, User] = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+
+
+def token_claims(user: User) -> dict[str, Any]:
+    """
+    Возвращает claims пользователя, которые кладутся в токен доступа.
+
+    Args:
+        user: Пользователь
+
+    Returns:
+        dict[str, Any]: Имя, email и дата регистрации пользователя
+    """
+    return {
+        "name": user.name,
+        "email": user.email,
+        "created_at": user.created_at.isoformat(),
+    }
+
+
+def user_from_claims(user_id: UUID, payload: dict[str, Any]) -> User | None:
+    """
+    Восстанавливает пользователя из claims токена без обращения к БД.
+
+    Args:
+        user_id: UUID пользователя
+        payload: Claims токена
+
+    Returns:
+        User | None: Несохранённый объект пользователя или None,
+            если в токене нет нужных claims (токен выпущен до их появления)
+    """
+    try:
+        return User(
+            id=user_id,
+            name=payload["name"],
+            email=payload["email"],
+            password_hash="",
+            created_at=datetime.fromisoformat(payload["created_at"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def detached_copy(user: User) -> User:
+    """
+    Копирует пользователя в объект, не привязанный к сессии, для кэша.
+
+    Args:
+        user: Пользователь, загруженный из БД
+
+    Returns:
+        User: Копия пользователя
+    """
+    return User(
+        id=user.id,
+        name=user.name,
+        email=user.email,
+        password_hash=user.password_hash,
+        created_at=user.created_at,
+    )
+
 
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
@@ -35,6 +104,9 @@ async def get_current_user(
     """
     Зависимость для получения текущего пользователя из JWT токена.
 
+    В режиме JWT_STATELESS пользователь восстанавливается из claims токена,
+    иначе берётся из кэша пользователей или из БД.
+
     Args:
         credentials: Bearer токен из заголовка Authorization
         db: Сессия базы данных
@@ -46,7 +118,11 @@ async def get_current_user(
         HTTPException: Если токен невалиден или пользователь не найден
     """
     token = credentials.credentials
-    user_id = decode_access_token(token)
+    payload = decode_access_token_payload(token)
+    try:
+        user_id = UUID(payload["sub"]) if payload is not None else None
+    except (TypeError, ValueError):
+        user_id = None
 
     if user_id is None:
         logger.warning("Invalid token provided")
@@ -56,6 +132,15 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    if settings.JWT_STATELESS:
+        user = user_from_claims(user_id, payload)
+        if user is not None:
+            return user
+
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
     result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
 
@@ -67,6 +152,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    user_cache.set(user_id, detached_copy(user))
     return user
 
 
@@ -106,7 +192,7 @@ async def register(
         )
 
     # Создание нового пользователя
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     new_user = User(
         name=user_data.name,
         email=user_data.email,
@@ -157,7 +243,7 @@ async def login(
         )
 
     # Проверка пароля
-    if not verify_password(login_data.password, user.password_hash):
+    if not await verify_password_async(login_data.password, user.password_hash):
         logger.warning(f"Invalid password attempt for email: {login_data.email}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -166,7 +252,7 @@ async def login(
         )
 
     # Создание токена
-    access_token = create_access_token(user.id)
+    access_token = create_access_token(user.id, token_claims(user))
     logger.info(f"User logged in successfully: {user.email}")
 
     return TokenResponse(access_token=access_token, token_type="bearer")
@@ -8,7 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.routes_auth import get_current_user
+from app.api.routes_auth import get_current_user, user_cache
 from app.db.session import get_db
 from app.schemas.user import UserResponse, UserUpdateName
 from common.models import User
@@ -69,6 +69,7 @@ async def update_user(
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    user_cache.pop(user.id)
 
     logger.info("User updated: %s", user.id)
     return UserResponse.model_validate(user)
@@ -97,6 +98,7 @@ async def delete_user(
 
     await db.execute(delete(User).where(User.id == user_id))
     await db.commit()
+    user_cache.pop(user_id)
 
     logger.info("User deleted: %s", user_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
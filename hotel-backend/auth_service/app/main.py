@@ -3,14 +3,19 @@
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.api.routes_auth import router as auth_router
+from app.api.routes_auth import router as auth_router, user_cache
 from app.api.routes_user import router as user_router
 from app.core.config import settings
 from app.db.session import engine
+from app.security.password import PasswordHasherBusyError, shutdown_password_hasher
+from common.db import pool_stats
+from common.health import ReadinessProbe, database_check, log_handler_check, setup_health
 from common.messaging.rabbit_handler import RabbitMQHandler
+from common.metrics import gauges, setup_metrics
 
 # Настройка логирования
 logging.basicConfig(
@@ -20,11 +25,21 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Подключаем отправку логов в RabbitMQ
+handler: RabbitMQHandler | None = None
 try:
     handler = RabbitMQHandler(
         url=settings.RABBITMQ_URL,
         queue_name=settings.RABBITMQ_QUEUE,
         service_name="auth_service",
+        buffer_size=settings.LOG_PUBLISH_BUFFER_SIZE,
+        batch_size=settings.LOG_PUBLISH_BATCH_SIZE,
+        flush_interval=settings.LOG_PUBLISH_FLUSH_INTERVAL_MS / 1000,
+        exchange=settings.RABBITMQ_LOG_EXCHANGE,
+        spill_path=settings.LOG_SPILL_PATH,
+        spill_max_bytes=settings.LOG_SPILL_MAX_BYTES,
+        breaker_backoff=settings.LOG_PUBLISH_BREAKER_BACKOFF_SECONDS,
+        breaker_max_backoff=settings.LOG_PUBLISH_BREAKER_MAX_BACKOFF_SECONDS,
+        replay_rate=settings.LOG_SPILL_REPLAY_RATE,
     )
     logging.getLogger().addHandler(handler)
 except Exception as e:
@@ -47,9 +62,14 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Shutting down Auth Service...")
+    shutdown_password_hasher()
     await engine.dispose()
     logger.info("Database connections closed")
 
+    # Досылаем накопленные логи и закрываем соединение с RabbitMQ
+    if handler is not None:
+        await handler.aclose()
+
 
 # Создание FastAPI приложения
 app = FastAPI(
@@ -69,6 +89,46 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Метрики Prometheus на /metrics
+metrics_registry = setup_metrics(app, engine)
+metrics_registry.register_collector(
+    lambda: [
+        *gauges("db_pool", "DB connection pool", pool_stats(engine)),
+        *gauges("user_cache", "User cache", user_cache.stats()),
+        *gauges("log_publisher", "RabbitMQ log publisher", handler.stats() if handler else {}),
+    ]
+)
+
+
+@app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusyError):
+    """
+    Отвечает 503, когда очередь хэширования паролей переполнена.
+
+    Args:
+        request: Входящий запрос
+        exc: Ошибка переполнения очереди
+
+    Returns:
+        JSONResponse: Ответ с заголовком Retry-After
+    """
+    logger.warning(f"Rejected {request.url.path}: password hasher is overloaded")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Service is busy, please retry later"},
+        headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+    )
+
+# Проверки готовности /readyz и живости /livez. Отправка логов не критична:
+# записи копятся в буфере обработчика до восстановления RabbitMQ
+readiness_probe = ReadinessProbe(
+    timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+    cache_seconds=settings.HEALTH_CHECK_CACHE_SECONDS,
+)
+readiness_probe.add("database", database_check(engine))
+readiness_probe.add("rabbitmq_log_handler", log_handler_check(handler), critical=False)
+setup_health(app, readiness_probe)
+
 # Подключение роутеров
 app.include_router(auth_router)
 app.include_router(user_router)
@@ -97,7 +157,11 @@ async def health_check():
     Returns:
         dict: Статус здоровья сервиса
     """
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "user_cache": user_cache.stats(),
+        "db_pool": pool_stats(engine),
+    }
 
 
 if __name__ == "__main__":
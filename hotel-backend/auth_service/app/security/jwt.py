@@ -1,6 +1,7 @@
 """Функции для создания и верификации JWT токенов."""
 
 from datetime import datetime, timedelta
+from typing import Any
 from uuid import UUID
 
 from jose import JWTError, jwt
@@ -8,12 +9,13 @@ from jose import JWTError, jwt
 from app.core.config import settings
 
 
-def create_access_token(user_id: UUID) -> str:
+def create_access_token(user_id: UUID, claims: dict[str, Any] | None = None) -> str:
     """
     Создает JWT токен доступа.
 
     Args:
         user_id: UUID пользователя
+        claims: Дополнительные claims (например, имя и email пользователя)
 
     Returns:
         str: JWT токен
@@ -22,6 +24,7 @@ def create_access_token(user_id: UUID) -> str:
         minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES
     )
     to_encode = {
+        **(claims or {}),
         "sub": str(user_id),
         "exp": expire,
     }
@@ -33,15 +36,15 @@ def create_access_token(user_id: UUID) -> str:
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> UUID | None:
+def decode_access_token_payload(token: str) -> dict[str, Any] | None:
     """
-    Декодирует и валидирует JWT токен.
+    Декодирует и валидирует JWT токен, возвращая все его claims.
 
     Args:
         token: JWT токен
 
     Returns:
-        UUID | None: UUID пользователя из токена или None если токен невалиден
+        dict[str, Any] | None: Claims токена или None если токен невалиден
     """
     try:
         payload = jwt.decode(
@@ -49,10 +52,28 @@ def decode_access_token(token: str) -> UUID | None:
             settings.JWT_SECRET,
             algorithms=[settings.JWT_ALGORITHM],
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
+        if payload.get("sub") is None:
             return None
-        return UUID(user_id)
-    except (JWTError, ValueError):
+        return payload
+    except JWTError:
+        return None
+
+
+def decode_access_token(token: str) -> UUID | None:
+    """
+    Декодирует и валидирует JWT токен.
+
+    Args:
+        token: JWT токен
+
+    Returns:
+        UUID | None: UUID пользователя из токена или None если токен невалиден
+    """
+    payload = decode_access_token_payload(token)
+    if payload is None:
+        return None
+    try:
+        return UUID(payload["sub"])
+    except (TypeError, ValueError):
         return None
 
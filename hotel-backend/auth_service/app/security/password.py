@@ -1,10 +1,31 @@
 """Функции для хэширования и проверки паролей."""
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
 from passlib.context import CryptContext
 
+from app.core.config import settings
+
+T = TypeVar("T")
+
 # Контекст для хэширования паролей
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt отпускает GIL, поэтому вычисления в потоках не блокируют event loop
+# и выполняются параллельно
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hasher",
+)
+# Количество операций в пуле: выполняющихся и ожидающих в очереди
+_pending = 0
+
+
+class PasswordHasherBusyError(Exception):
+    """Очередь хэширования паролей переполнена."""
+
 
 def hash_password(password: str) -> str:
     """
@@ -32,3 +53,66 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     return pwd_context.verify(plain_password, hashed_password)
 
+
+async def _run_in_pool(func: Callable[..., T], *args) -> T:
+    """
+    Выполняет функцию в пуле хэширования с ограничением длины очереди.
+
+    Args:
+        func: Синхронная функция
+        args: Аргументы функции
+
+    Returns:
+        T: Результат функции
+
+    Raises:
+        PasswordHasherBusyError: Если в пуле уже PASSWORD_HASH_MAX_PENDING операций
+    """
+    global _pending
+    if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise PasswordHasherBusyError("Password hasher is overloaded")
+
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, func, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Хэширует пароль в пуле потоков, не блокируя event loop.
+
+    Args:
+        password: Пароль в открытом виде
+
+    Returns:
+        str: Хэшированный пароль
+
+    Raises:
+        PasswordHasherBusyError: Если очередь хэширования переполнена
+    """
+    return await _run_in_pool(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Проверяет пароль в пуле потоков, не блокируя event loop.
+
+    Args:
+        plain_password: Пароль в открытом виде
+        hashed_password: Хэшированный пароль
+
+    Returns:
+        bool: True если пароль совпадает, иначе False
+
+    Raises:
+        PasswordHasherBusyError: Если очередь хэширования переполнена
+    """
+    return await _run_in_pool(verify_password, plain_password, hashed_password)
+
+
+def shutdown_password_hasher() -> None:
+    """Останавливает пул хэширования паролей."""
+    _executor.shutdown(wait=False, cancel_futures=True)
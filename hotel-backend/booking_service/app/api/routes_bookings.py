@@ -1,59 +1,86 @@
 """API маршруты для бронирований."""
 
 import logging
-from datetime import date
+from datetime import datetime
 from typing import Annotated
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import Date, Uuid, exists, func, insert, literal, select, true
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.db.session import get_db
-from app.dependencies import CurrentUser, get_current_user
+from app.core.availability import availability_index
+from app.core.config import settings
+from app.db.errors import (
+    EXCLUSION_VIOLATION,
+    FOREIGN_KEY_VIOLATION,
+    RETRYABLE_SQLSTATES,
+    get_sqlstate,
+)
+from app.db.session import AsyncSessionLocal, get_db
+from app.dependencies import CurrentUser, get_admin_user, get_current_user
+from common.export import ExportFormat, export_response
+from common.http_cache import etag_matches, not_modified, weak_etag
 from common.models import Booking, Room
+from common.pagination import (
+    NEXT_CURSOR_HEADER,
+    apply_keyset,
+    decode_cursor,
+    split_page,
+)
 from app.schemas.booking import BookingCreate, BookingResponse
+from app.schemas.room import RoomResponse
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/bookings", tags=["Bookings"])
 
 
-async def check_room_availability(
-    room_id: UUID,
-    check_in: date,
-    check_out: date,
-    db: AsyncSession,
-    exclude_booking_id: UUID | None = None,
-) -> bool:
+def insert_booking_query(booking_id: UUID, user_id: UUID, booking_data: BookingCreate):
     """
-    Проверяет доступность комнаты на указанные даты.
+    Строит запрос, который одной операцией создаёт бронирование.
+
+    CTE room читает комнату, CTE inserted вставляет бронирование, только если
+    комната существует и на эти даты нет пересекающихся бронирований.
+    Результат: нет строк - комнаты нет; booking_id пуст - даты заняты;
+    иначе строка комнаты с id и created_at нового бронирования.
 
     Args:
-        room_id: UUID комнаты
-        check_in: Дата заезда
-        check_out: Дата выезда
-        db: Сессия базы данных
-        exclude_booking_id: UUID бронирования для исключения из проверки (при обновлении)
+        booking_id: UUID нового бронирования
+        user_id: UUID пользователя
+        booking_data: Данные бронирования
 
     Returns:
-        bool: True если комната доступна, False если занята
+        Select: Запрос с CTE вставки
     """
-    # Поиск пересекающихся бронирований
-    query = select(Booking).where(
-        Booking.room_id == room_id,
-        Booking.check_in_date < check_out,
-        Booking.check_out_date > check_in,
+    room = select(Room).where(Room.id == booking_data.room_id).cte("room")
+    conflict = exists().where(
+        Booking.room_id == booking_data.room_id,
+        Booking.check_in_date < booking_data.check_out_date,
+        Booking.check_out_date > booking_data.check_in_date,
     )
-
-    if exclude_booking_id:
-        query = query.where(Booking.id != exclude_booking_id)
-
-    result = await db.execute(query)
-    conflicting_bookings = result.scalars().all()
-
-    return len(conflicting_bookings) == 0
+    inserted = (
+        insert(Booking)
+        .from_select(
+            ["id", "user_id", "room_id", "check_in_date", "check_out_date"],
+            select(
+                literal(booking_id, Uuid()),
+                literal(user_id, Uuid()),
+                room.c.id,
+                literal(booking_data.check_in_date, Date()),
+                literal(booking_data.check_out_date, Date()),
+            ).where(~conflict),
+        )
+        .returning(Booking.id, Booking.created_at)
+        .cte("inserted")
+    )
+    return select(
+        room,
+        inserted.c.id.label("booking_id"),
+        inserted.c.created_at,
+    ).select_from(room.outerjoin(inserted, true()))
 
 
 @router.post(
@@ -82,55 +109,111 @@ async def create_booking(
     Raises:
         HTTPException: Если комната не найдена или недоступна на указанные даты
     """
-    # Проверка существования комнаты
-    result = await db.execute(select(Room).where(Room.id == booking_data.room_id))
-    room = result.scalar_one_or_none()
-
-    if room is None:
+    # Отказ по индексу занятости без вставки: индекс может отставать от других
+    # реплик, поэтому найденные в нём бронирования подтверждаются одним
+    # запросом по первичному ключу
+    connection = await db.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+    indexed_conflicts = availability_index.conflicts(
+        booking_data.room_id,
+        booking_data.check_in_date,
+        booking_data.check_out_date,
+    )
+    if indexed_conflicts:
+        confirmed = (
+            await connection.execute(
+                select(
+                    exists().where(
+                        Booking.id.in_(indexed_conflicts),
+                        Booking.room_id == booking_data.room_id,
+                        Booking.check_in_date < booking_data.check_out_date,
+                        Booking.check_out_date > booking_data.check_in_date,
+                    )
+                )
+            )
+        ).scalar()
+        if confirmed:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Room is not available for the selected dates",
+            )
+        # Бронирования уже удалены или перенесены другой репликой
+        for stale_booking_id in indexed_conflicts:
+            availability_index.remove(stale_booking_id)
+
+    # Проверка комнаты, проверка пересечений и вставка выполняются одним
+    # запросом в режиме AUTOCOMMIT: без отдельных BEGIN/COMMIT и повторной
+    # загрузки бронирования с комнатой
+    for attempt in range(settings.BOOKING_INSERT_ATTEMPTS):
+        booking_id = uuid4()
+        try:
+            if connection is None:
+                connection = await db.connection(execution_options={"isolation_level": "AUTOCOMMIT"})
+            row = (
+                await connection.execute(
+                    insert_booking_query(booking_id, current_user.id, booking_data)
+                )
+            ).one_or_none()
+            break
+        except DBAPIError as e:
+            await db.rollback()
+            connection = None
+            sqlstate = get_sqlstate(e)
+            # Конкурентная вставка, не видимая NOT EXISTS, отклоняется exclusion constraint
+            if sqlstate == EXCLUSION_VIOLATION:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Room is not available for the selected dates",
+                )
+            # Комнату удалили между чтением и вставкой
+            if sqlstate == FOREIGN_KEY_VIOLATION:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Room not found",
+                )
+            if sqlstate in RETRYABLE_SQLSTATES and attempt + 1 < settings.BOOKING_INSERT_ATTEMPTS:
+                logger.warning(f"Retrying booking insert after {sqlstate}")
+                continue
+            raise
+
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Room not found",
         )
+    if row.booking_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Room is not available for the selected dates",
+        )
 
-    # Проверка доступности комнаты
-    is_available = await check_room_availability(
+    availability_index.add(
+        booking_id,
         booking_data.room_id,
         booking_data.check_in_date,
         booking_data.check_out_date,
-        db,
     )
 
-    if not is_available:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Room is not available for the selected dates",
-        )
-
-    new_booking = Booking(
+    logger.info(
+        f"Booking created: {booking_id} for room {booking_data.room_id} "
+        f"by user {current_user.id}"
+    )
+    return BookingResponse(
+        id=booking_id,
         user_id=current_user.id,
         room_id=booking_data.room_id,
         check_in_date=booking_data.check_in_date,
         check_out_date=booking_data.check_out_date,
+        created_at=row.created_at,
+        room=RoomResponse(
+            id=row.id,
+            hotel_id=row.hotel_id,
+            room_number=row.room_number,
+            room_type=row.room_type,
+            price_per_night=row.price_per_night,
+            img_url=row.img_url,
+        ),
     )
 
-    db.add(new_booking)
-    await db.commit()
-    await db.refresh(new_booking)
-
-    # Загружаем связанную комнату для ответа
-    result = await db.execute(
-        select(Booking)
-        .where(Booking.id == new_booking.id)
-        .options(selectinload(Booking.room))
-    )
-    booking_with_room = result.scalar_one()
-
-    logger.info(
-        f"Booking created: {new_booking.id} for room {booking_data.room_id} "
-        f"by user {current_user.id}"
-    )
-    return BookingResponse.model_validate(booking_with_room)
-
 
 @router.get(
     "/my",
@@ -139,30 +222,144 @@ async def create_booking(
     description="Возвращает список бронирований текущего пользователя",
 )
 async def get_my_bookings(
+    request: Request,
+    response: Response,
     db: Annotated[AsyncSession, Depends(get_db)],
     current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    limit: int = Query(100, ge=1, le=500, description="Размер страницы"),
+    cursor: str | None = Query(None, description="Курсор следующей страницы"),
 ) -> list[BookingResponse]:
     """
-    Получить список бронирований текущего пользователя.
+    Получить список бронирований текущего пользователя с курсорной пагинацией.
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    ETag строится по количеству и последнему created_at бронирований
+    пользователя и последнему изменению забронированных комнат без выборки
+    и сериализации списка; при совпадении с If-None-Match возвращается 304.
 
     Args:
+        request: Входящий запрос (для If-None-Match)
+        response: Ответ для установки заголовков
         db: Сессия базы данных
         current_user: Текущий пользователь
+        limit: Размер страницы
+        cursor: Курсор, полученный с предыдущей страницей
 
     Returns:
         list[BookingResponse]: Список бронирований
     """
+    after = decode_cursor(cursor, datetime, UUID) if cursor else None
+
+    # Версия списка: бронирования не изменяются, только создаются (с более
+    # поздним created_at) и удаляются, поэтому их набор описывают количество и
+    # последний created_at. Данные комнат в ответе описывает последний
+    # updated_at забронированных комнат; удаление комнаты каскадно удаляет её
+    # бронирования и меняет количество. Версия читается из БД и одинакова на
+    # всех репликах. Она считается до выборки: если список изменится между
+    # запросами, клиент получит старый ETag и обновит данные при следующем опросе
+    count, last_created_at, rooms_updated_at = (
+        await db.execute(
+            select(func.count(), func.max(Booking.created_at), func.max(Room.updated_at))
+            .select_from(Booking)
+            .join(Room, Booking.room_id == Room.id)
+            .where(Booking.user_id == current_user.id)
+        )
+    ).one()
+    headers = {
+        "ETag": weak_etag(current_user.id, limit, cursor, count, last_created_at, rooms_updated_at),
+        "Cache-Control": settings.BOOKINGS_CACHE_CONTROL,
+    }
+    if etag_matches(request, headers["ETag"]):
+        return not_modified(headers)
+    response.headers.update(headers)
+
     result = await db.execute(
-        select(Booking)
-        .where(Booking.user_id == current_user.id)
-        .options(selectinload(Booking.room))
-        .order_by(Booking.created_at.desc())
+        apply_keyset(
+            select(Booking)
+            .where(Booking.user_id == current_user.id)
+            .options(selectinload(Booking.room)),
+            [Booking.created_at, Booking.id],
+            after,
+            limit,
+            descending=True,
+        )
     )
-    bookings = result.scalars().all()
+    bookings, next_cursor = split_page(
+        result.scalars().all(),
+        limit,
+        lambda booking: (booking.created_at, booking.id),
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
     return [BookingResponse.model_validate(booking) for booking in bookings]
 
 
+@router.get(
+    "/export",
+    summary="Выгрузка бронирований",
+    description="Потоковая выгрузка всех бронирований в NDJSON или CSV (только для администраторов)",
+)
+async def export_bookings(
+    current_user: Annotated[CurrentUser, Depends(get_admin_user)],
+    from_: datetime | None = Query(None, alias="from", description="Начало интервала created_at (включительно)"),
+    to: datetime | None = Query(None, description="Конец интервала created_at (не включительно)"),
+    export_format: ExportFormat = Query("ndjson", alias="format", description="Формат выгрузки"),
+):
+    """
+    Выгрузить бронирования для сверки потоком NDJSON или CSV.
+
+    Строки читаются серверным курсором пачками по EXPORT_BATCH_SIZE,
+    поэтому память не зависит от числа бронирований.
+
+    Args:
+        current_user: Текущий пользователь (администратор)
+        from_: Начало интервала по времени создания (параметр from)
+        to: Конец интервала по времени создания
+        export_format: Формат выгрузки: ndjson или csv (параметр format)
+
+    Returns:
+        StreamingResponse: Бронирования в порядке created_at
+
+    Raises:
+        HTTPException: Если пользователь не администратор или from не раньше to
+    """
+    if from_ is not None and to is not None and from_ >= to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parameter 'from' must be earlier than 'to'",
+        )
+
+    query = (
+        select(
+            Booking.id,
+            Booking.user_id,
+            Booking.room_id,
+            Room.hotel_id,
+            Room.room_number,
+            Booking.check_in_date,
+            Booking.check_out_date,
+            Room.price_per_night,
+            Booking.created_at,
+        )
+        .join(Room, Room.id == Booking.room_id)
+        .order_by(Booking.created_at, Booking.id)
+    )
+    if from_ is not None:
+        query = query.where(Booking.created_at >= from_)
+    if to is not None:
+        query = query.where(Booking.created_at < to)
+
+    logger.info(f"Bookings export started by user {current_user.id}")
+    return export_response(
+        AsyncSessionLocal,
+        query,
+        export_format,
+        "bookings",
+        settings.EXPORT_BATCH_SIZE,
+    )
+
+
 @router.delete(
     "/{booking_id}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -206,6 +403,8 @@ async def delete_booking(
     await db.delete(booking)
     await db.commit()
 
+    availability_index.remove(booking_id)
+
     logger.info(
         f"Booking deleted: {booking_id} by user {current_user.id}"
     )
@@ -1,44 +1,182 @@
 """API маршруты для отелей."""
 
 import logging
-from typing import Annotated
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Annotated, Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
-
+from sqlalchemy.orm import selectinload
+
+from app.core.availability import availability_index
+from app.core.catalog_cache import (
+    HOTELS_NAMESPACE,
+    HOTELS_WITH_ROOMS_NAMESPACE,
+    catalog_cache,
+    hotel_rooms_namespace,
+    room_namespace,
+)
 from app.db.session import get_db
 from app.dependencies import CurrentUser, get_current_user
-from common.models import Hotel
-from app.schemas.hotel import HotelCreate, HotelResponse, HotelUpdate
+from common.models import Booking, Hotel, Room
+from common.pagination import (
+    NEXT_CURSOR_HEADER,
+    apply_keyset,
+    decode_cursor,
+    split_page,
+)
+from app.schemas.hotel import (
+    HotelCreate,
+    HotelResponse,
+    HotelUpdate,
+    HotelWithRoomsResponse,
+)
+from app.schemas.room import RoomResponse
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/hotels", tags=["Hotels"])
 
+# Сериализация списков отелей сразу в JSON для кэша каталога
+hotels_adapter = TypeAdapter(list[HotelResponse])
+hotels_with_rooms_adapter = TypeAdapter(list[HotelWithRoomsResponse])
+
 
 @router.get(
     "/",
-    response_model=list[HotelResponse],
+    response_model=list[HotelWithRoomsResponse] | list[HotelResponse],
     summary="Список отелей",
-    description="Возвращает список всех отелей",
+    description="Возвращает список всех отелей (с комнатами при include=rooms)",
 )
 async def get_hotels(
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
-) -> list[HotelResponse]:
+    include: Literal["rooms"] | None = Query(None, description="Подгрузить комнаты отелей"),
+    limit: int = Query(100, ge=1, le=500, description="Размер страницы"),
+    cursor: str | None = Query(None, description="Курсор следующей страницы"),
+) -> Response:
     """
-    Получить список всех отелей.
+    Получить список отелей (новые первыми) с курсорной пагинацией.
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    Готовые ответы кэшируются и сбрасываются при изменении отелей и комнат;
+    при совпадении If-None-Match с ETag возвращается 304.
 
     Args:
+        request: Входящий запрос (для If-None-Match)
         db: Сессия базы данных
+        include: Опциональное расширение ответа (rooms — комнаты отелей)
+        limit: Размер страницы
+        cursor: Курсор, полученный с предыдущей страницей
 
     Returns:
-        list[HotelResponse]: Список отелей
+        Response: JSON-список отелей (HotelResponse или HotelWithRoomsResponse)
+    """
+    after = decode_cursor(cursor, datetime, UUID) if cursor else None
+
+    namespace = HOTELS_WITH_ROOMS_NAMESPACE if include == "rooms" else HOTELS_NAMESPACE
+    cache_key = await catalog_cache.key(namespace, (limit, cursor))
+    cached = await catalog_cache.lookup(request, cache_key)
+    if cached is not None:
+        return cached
+
+    query = apply_keyset(
+        select(Hotel),
+        [Hotel.created_at, Hotel.id],
+        after,
+        limit,
+        descending=True,
+    )
+    if include == "rooms":
+        query = query.options(selectinload(Hotel.rooms))
+
+    result = await db.execute(query)
+    hotels, next_cursor = split_page(
+        result.scalars().all(),
+        limit,
+        lambda hotel: (hotel.created_at, hotel.id),
+    )
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+
+    if include == "rooms":
+        body = hotels_with_rooms_adapter.dump_json(
+            [HotelWithRoomsResponse.model_validate(hotel) for hotel in hotels]
+        )
+    else:
+        body = hotels_adapter.dump_json([HotelResponse.model_validate(hotel) for hotel in hotels])
+
+    return await catalog_cache.respond(request, cache_key, body, headers)
+
+
+@router.get(
+    "/{hotel_id}/availability",
+    response_model=list[RoomResponse],
+    summary="Свободные комнаты отеля",
+    description="Возвращает все комнаты отеля, свободные на указанные даты",
+)
+async def get_hotel_availability(
+    hotel_id: UUID,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    check_in: date = Query(..., description="Дата заезда"),
+    check_out: date = Query(..., description="Дата выезда"),
+    room_type: int | None = Query(None, description="Фильтр по типу комнаты"),
+    max_price: Decimal | None = Query(None, gt=0, description="Максимальная цена за ночь"),
+) -> list[RoomResponse]:
     """
-    result = await db.execute(select(Hotel).order_by(Hotel.created_at.desc()))
-    hotels = result.scalars().all()
-    return [HotelResponse.model_validate(hotel) for hotel in hotels]
+    Получить свободные комнаты отеля на указанные даты.
+
+    Свободные комнаты выбираются одним запросом (anti-join с бронированиями),
+    без отдельной проверки каждой комнаты.
+
+    Args:
+        hotel_id: UUID отеля
+        db: Сессия базы данных
+        check_in: Дата заезда
+        check_out: Дата выезда
+        room_type: Опциональный фильтр по типу комнаты
+        max_price: Опциональный фильтр по максимальной цене за ночь
+
+    Returns:
+        list[RoomResponse]: Список свободных комнат
+
+    Raises:
+        HTTPException: Если даты некорректны или отель не найден
+    """
+    if check_out <= check_in:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="check_out must be greater than check_in",
+        )
+
+    has_conflict = exists().where(
+        Booking.room_id == Room.id,
+        Booking.check_in_date < check_out,
+        Booking.check_out_date > check_in,
+    )
+    query = select(Room).where(Room.hotel_id == hotel_id, ~has_conflict)
+
+    if room_type is not None:
+        query = query.where(Room.room_type == room_type)
+    if max_price is not None:
+        query = query.where(Room.price_per_night <= max_price)
+
+    result = await db.execute(query.order_by(Room.room_number))
+    rooms = result.scalars().all()
+
+    # Существование отеля проверяем, только если свободных комнат нет
+    if not rooms:
+        hotel_exists = await db.execute(select(exists().where(Hotel.id == hotel_id)))
+        if not hotel_exists.scalar():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Hotel not found",
+            )
+
+    return [RoomResponse.model_validate(room) for room in rooms]
 
 
 # @router.get(
@@ -110,6 +248,7 @@ async def create_hotel(
     db.add(new_hotel)
     await db.commit()
     await db.refresh(new_hotel)
+    await catalog_cache.invalidate(HOTELS_NAMESPACE, HOTELS_WITH_ROOMS_NAMESPACE)
 
     logger.info(f"Hotel created: {new_hotel.id} by user {current_user.id}")
     return HotelResponse.model_validate(new_hotel)
@@ -158,6 +297,7 @@ async def update_hotel(
 
     await db.commit()
     await db.refresh(hotel)
+    await catalog_cache.invalidate(HOTELS_NAMESPACE, HOTELS_WITH_ROOMS_NAMESPACE)
 
     logger.info(f"Hotel updated: {hotel_id} by user {current_user.id}")
     return HotelResponse.model_validate(hotel)
@@ -194,8 +334,21 @@ async def delete_hotel(
             detail="Hotel not found",
         )
 
+    room_ids = (
+        await db.execute(select(Room.id).where(Room.hotel_id == hotel_id))
+    ).scalars().all()
+
     await db.delete(hotel)
     await db.commit()
 
+    for room_id in room_ids:
+        availability_index.drop_room(room_id)
+    await catalog_cache.invalidate(
+        HOTELS_NAMESPACE,
+        HOTELS_WITH_ROOMS_NAMESPACE,
+        hotel_rooms_namespace(hotel_id),
+        *(room_namespace(room_id) for room_id in room_ids),
+    )
+
     logger.info(f"Hotel deleted: {hotel_id} by user {current_user.id}")
 
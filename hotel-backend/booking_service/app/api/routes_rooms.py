@@ -1,22 +1,122 @@
 """API маршруты для комнат."""
 
 import logging
-from typing import Annotated
+from typing import Annotated, Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, status
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import Uuid, column, insert, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.availability import availability_index
+from app.core.config import settings
+from app.core.catalog_cache import (
+    HOTELS_WITH_ROOMS_NAMESPACE,
+    catalog_cache,
+    hotel_rooms_namespace,
+    room_namespace,
+)
 from app.db.session import get_db
 from app.dependencies import CurrentUser, get_current_user
 from common.models import Hotel, Room
-from app.schemas.room import RoomCreate, RoomResponse, RoomUpdate
+from common.pagination import (
+    NEXT_CURSOR_HEADER,
+    apply_keyset,
+    decode_cursor,
+    split_page,
+)
+from app.schemas.room import (
+    RoomBatchItemResult,
+    RoomBatchResponse,
+    RoomBatchUpdate,
+    RoomCreate,
+    RoomResponse,
+    RoomUpdate,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["Rooms"])
 
+# Сериализация списка комнат сразу в JSON для кэша каталога
+rooms_adapter = TypeAdapter(list[RoomResponse])
+
+# Строк в одном UPDATE ... FROM (VALUES ...): держит число параметров
+# запроса ниже лимита PostgreSQL (32767) при любом наборе полей
+ROOMS_BATCH_CHUNK_SIZE = 1000
+
+
+def check_batch_size(items: list) -> None:
+    """
+    Проверяет, что пакет не превышает ROOMS_BATCH_MAX_ITEMS.
+
+    Args:
+        items: Элементы пакета
+
+    Raises:
+        HTTPException: Если элементов больше допустимого
+    """
+    if len(items) > settings.ROOMS_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch is limited to {settings.ROOMS_BATCH_MAX_ITEMS} items",
+        )
+
+
+def validate_batch(
+    items: list[Any],
+    schema: type[BaseModel],
+) -> tuple[list[tuple[int, BaseModel]], dict[int, RoomBatchItemResult]]:
+    """
+    Валидирует элементы пакета по отдельности за один проход.
+
+    Ошибка в одном элементе не отклоняет весь запрос: элемент получает
+    статус invalid, остальные обрабатываются.
+
+    Args:
+        items: Элементы пакета в исходном виде
+        schema: Схема элемента
+
+    Returns:
+        tuple: Валидные элементы с позициями и результаты для невалидных
+    """
+    valid: list[tuple[int, BaseModel]] = []
+    invalid: dict[int, RoomBatchItemResult] = {}
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+        except ValidationError as e:
+            invalid[index] = RoomBatchItemResult(
+                index=index,
+                status="invalid",
+                errors=[
+                    {"loc": list(error["loc"]), "msg": error["msg"], "type": error["type"]}
+                    for error in e.errors()
+                ],
+            )
+    return valid, invalid
+
+
+def batch_response(results: dict[int, RoomBatchItemResult]) -> RoomBatchResponse:
+    """
+    Собирает ответ на пакетный запрос в порядке элементов запроса.
+
+    Args:
+        results: Результаты по позициям элементов
+
+    Returns:
+        RoomBatchResponse: Итоги и результаты по элементам
+    """
+    ordered = [results[index] for index in sorted(results)]
+    failed = sum(1 for result in ordered if result.status in ("invalid", "not_found"))
+    return RoomBatchResponse(
+        succeeded=len(ordered) - failed,
+        failed=failed,
+        results=ordered,
+    )
+
+
 @router.get(
     "/hotels/{hotel_id}/rooms",
     response_model=list[RoomResponse],
@@ -25,21 +125,36 @@ router = APIRouter(tags=["Rooms"])
 )
 async def get_hotel_rooms(
     hotel_id: UUID,
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
-) -> list[RoomResponse]:
+    limit: int = Query(100, ge=1, le=500, description="Размер страницы"),
+    cursor: str | None = Query(None, description="Курсор следующей страницы"),
+) -> Response:
     """
-    Получить список комнат отеля.
+    Получить список комнат отеля с курсорной пагинацией.
+
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor.
+    Готовые ответы кэшируются и сбрасываются при изменении комнат отеля;
+    при совпадении If-None-Match с ETag возвращается 304.
 
     Args:
         hotel_id: UUID отеля
+        request: Входящий запрос (для If-None-Match)
         db: Сессия базы данных
+        limit: Размер страницы
+        cursor: Курсор, полученный с предыдущей страницей
 
     Returns:
-        list[RoomResponse]: Список комнат
+        Response: JSON-список комнат (RoomResponse)
 
     Raises:
         HTTPException: Если отель не найден
     """
+    cache_key = await catalog_cache.key(hotel_rooms_namespace(hotel_id), (limit, cursor))
+    cached = await catalog_cache.lookup(request, cache_key)
+    if cached is not None:
+        return cached
+
     # Проверка существования отеля
     result = await db.execute(select(Hotel).where(Hotel.id == hotel_id))
     hotel = result.scalar_one_or_none()
@@ -50,11 +165,24 @@ async def get_hotel_rooms(
             detail="Hotel not found",
         )
 
+    after = decode_cursor(cursor, str, UUID) if cursor else None
     result = await db.execute(
-        select(Room).where(Room.hotel_id == hotel_id).order_by(Room.room_number)
+        apply_keyset(
+            select(Room).where(Room.hotel_id == hotel_id),
+            [Room.room_number, Room.id],
+            after,
+            limit,
+        )
+    )
+    rooms, next_cursor = split_page(
+        result.scalars().all(),
+        limit,
+        lambda room: (room.room_number, room.id),
     )
-    rooms = result.scalars().all()
-    return [RoomResponse.model_validate(room) for room in rooms]
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    body = rooms_adapter.dump_json([RoomResponse.model_validate(room) for room in rooms])
+
+    return await catalog_cache.respond(request, cache_key, body, headers)
 
 
 @router.post(
@@ -106,11 +234,178 @@ async def create_hotel_room(
     db.add(new_room)
     await db.commit()
     await db.refresh(new_room)
+    await catalog_cache.invalidate(hotel_rooms_namespace(hotel_id), HOTELS_WITH_ROOMS_NAMESPACE)
 
     logger.info(f"Room created: {new_room.id} for hotel {hotel_id} by user {current_user.id}")
     return RoomResponse.model_validate(new_room)
 
 
+@router.post(
+    "/hotels/{hotel_id}/rooms:batch",
+    response_model=RoomBatchResponse,
+    summary="Создать комнаты пакетом",
+    description=(
+        "Создает до ROOMS_BATCH_MAX_ITEMS комнат отеля одним запросом "
+        "и возвращает результат по каждому элементу (требуется авторизация)"
+    ),
+)
+async def create_hotel_rooms_batch(
+    hotel_id: UUID,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    items: list[Any] = Body(..., description="Список комнат (RoomCreate)"),
+) -> RoomBatchResponse:
+    """
+    Создать комнаты отеля пакетом.
+
+    Невалидные элементы пропускаются с ошибками в результате, валидные
+    вставляются в одной транзакции многострочными INSERT ... RETURNING.
+
+    Args:
+        hotel_id: UUID отеля
+        db: Сессия базы данных
+        current_user: Текущий пользователь
+        items: Элементы пакета
+
+    Returns:
+        RoomBatchResponse: Результат по каждому элементу
+
+    Raises:
+        HTTPException: Если отель не найден или пакет слишком большой
+    """
+    check_batch_size(items)
+
+    # Проверка существования отеля
+    result = await db.execute(select(Hotel.id).where(Hotel.id == hotel_id))
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Hotel not found",
+        )
+
+    valid, results = validate_batch(items, RoomCreate)
+    if valid:
+        # insertmanyvalues разбивает вставку на многострочные INSERT,
+        # sort_by_parameter_order сохраняет порядок RETURNING как у параметров
+        rooms = (
+            await db.scalars(
+                insert(Room).returning(Room, sort_by_parameter_order=True),
+                [{**room_data.model_dump(), "hotel_id": hotel_id} for _, room_data in valid],
+            )
+        ).all()
+        await db.commit()
+        await catalog_cache.invalidate(hotel_rooms_namespace(hotel_id), HOTELS_WITH_ROOMS_NAMESPACE)
+
+        for (index, _), room in zip(valid, rooms):
+            results[index] = RoomBatchItemResult(
+                index=index,
+                status="created",
+                room=RoomResponse.model_validate(room),
+            )
+
+    logger.info(
+        f"Rooms batch created: {len(valid)} of {len(items)} for hotel {hotel_id} "
+        f"by user {current_user.id}"
+    )
+    return batch_response(results)
+
+
+@router.patch(
+    "/rooms:batch",
+    response_model=RoomBatchResponse,
+    summary="Обновить комнаты пакетом",
+    description=(
+        "Обновляет до ROOMS_BATCH_MAX_ITEMS комнат одним запросом "
+        "и возвращает результат по каждому элементу (требуется авторизация)"
+    ),
+)
+async def update_rooms_batch(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+    items: list[Any] = Body(..., description="Список изменений (id и поля RoomUpdate)"),
+) -> RoomBatchResponse:
+    """
+    Обновить комнаты пакетом.
+
+    Элементы группируются по набору изменяемых полей; каждая группа
+    обновляется запросом UPDATE ... FROM (VALUES ...) RETURNING.
+    Все группы выполняются в одной транзакции.
+
+    Args:
+        db: Сессия базы данных
+        current_user: Текущий пользователь
+        items: Элементы пакета
+
+    Returns:
+        RoomBatchResponse: Результат по каждому элементу
+
+    Raises:
+        HTTPException: Если пакет слишком большой
+    """
+    check_batch_size(items)
+
+    valid, results = validate_batch(items, RoomBatchUpdate)
+
+    # Повтор id в пакете сделал бы результат зависимым от порядка строк VALUES
+    groups: dict[tuple[str, ...], list[tuple[int, dict[str, Any]]]] = {}
+    seen: set[UUID] = set()
+    for index, room_data in valid:
+        if room_data.id in seen:
+            results[index] = RoomBatchItemResult(
+                index=index,
+                status="invalid",
+                errors=[{"loc": ["id"], "msg": "Duplicate room id in batch", "type": "value_error"}],
+            )
+            continue
+        seen.add(room_data.id)
+        changes = room_data.model_dump(exclude_unset=True)
+        fields = tuple(sorted(field for field in changes if field != "id"))
+        groups.setdefault(fields, []).append((index, changes))
+
+    updated: dict[UUID, Room] = {}
+    for fields, group in groups.items():
+        for start in range(0, len(group), ROOMS_BATCH_CHUNK_SIZE):
+            chunk = group[start:start + ROOMS_BATCH_CHUNK_SIZE]
+            if not fields:
+                # Без изменяемых полей комната возвращается как есть, как в PUT
+                stmt = select(Room).where(Room.id.in_([changes["id"] for _, changes in chunk]))
+            else:
+                batch = values(
+                    column("id", Uuid()),
+                    *(column(field, Room.__table__.c[field].type) for field in fields),
+                    name="batch",
+                ).data([(changes["id"], *(changes[field] for field in fields)) for _, changes in chunk])
+                stmt = (
+                    update(Room)
+                    .where(Room.id == batch.c.id)
+                    .values({field: batch.c[field] for field in fields})
+                    .returning(Room)
+                    .execution_options(synchronize_session=False)
+                )
+            for room in (await db.scalars(stmt)).all():
+                updated[room.id] = room
+    await db.commit()
+
+    for group in groups.values():
+        for index, changes in group:
+            room = updated.get(changes["id"])
+            results[index] = (
+                RoomBatchItemResult(index=index, status="updated", room=RoomResponse.model_validate(room))
+                if room is not None
+                else RoomBatchItemResult(index=index, status="not_found")
+            )
+
+    if updated:
+        await catalog_cache.invalidate(
+            *(room_namespace(room_id) for room_id in updated),
+            *{hotel_rooms_namespace(room.hotel_id) for room in updated.values()},
+            HOTELS_WITH_ROOMS_NAMESPACE,
+        )
+
+    logger.info(f"Rooms batch updated: {len(updated)} of {len(items)} by user {current_user.id}")
+    return batch_response(results)
+
+
 @router.get(
     "/rooms/{room_id}",
     response_model=RoomResponse,
@@ -119,21 +414,28 @@ async def create_hotel_room(
 )
 async def get_room(
     room_id: UUID,
+    request: Request,
     db: Annotated[AsyncSession, Depends(get_db)],
-) -> RoomResponse:
+) -> Response:
     """
-    Получить комнату по ID.
+    Получить комнату по ID (с ETag и ответом 304 на If-None-Match).
 
     Args:
         room_id: UUID комнаты
+        request: Входящий запрос (для If-None-Match)
         db: Сессия базы данных
 
     Returns:
-        RoomResponse: Информация о комнате
+        Response: Информация о комнате в JSON (RoomResponse)
 
     Raises:
         HTTPException: Если комната не найдена
     """
+    cache_key = await catalog_cache.key(room_namespace(room_id))
+    cached = await catalog_cache.lookup(request, cache_key)
+    if cached is not None:
+        return cached
+
     result = await db.execute(select(Room).where(Room.id == room_id))
     room = result.scalar_one_or_none()
 
@@ -143,7 +445,8 @@ async def get_room(
             detail="Room not found",
         )
 
-    return RoomResponse.model_validate(room)
+    body = RoomResponse.model_validate(room).model_dump_json().encode()
+    return await catalog_cache.respond(request, cache_key, body)
 
 
 @router.put(
@@ -189,6 +492,11 @@ async def update_room(
 
     await db.commit()
     await db.refresh(room)
+    await catalog_cache.invalidate(
+        room_namespace(room_id),
+        hotel_rooms_namespace(room.hotel_id),
+        HOTELS_WITH_ROOMS_NAMESPACE,
+    )
 
     logger.info(f"Room updated: {room_id} by user {current_user.id}")
     return RoomResponse.model_validate(room)
@@ -228,5 +536,12 @@ async def delete_room(
     await db.delete(room)
     await db.commit()
 
+    availability_index.drop_room(room_id)
+    await catalog_cache.invalidate(
+        room_namespace(room_id),
+        hotel_rooms_namespace(room.hotel_id),
+        HOTELS_WITH_ROOMS_NAMESPACE,
+    )
+
     logger.info(f"Room deleted: {room_id} by user {current_user.id}")
 
@@ -0,0 +1,182 @@
+"""Индекс занятости комнат в памяти процесса."""
+
+import asyncio
+import logging
+from bisect import bisect_left
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from common.models import Booking
+
+logger = logging.getLogger(__name__)
+
+
+class RoomAvailabilityIndex:
+    """
+    Интервальный индекс бронирований по комнатам.
+
+    Для каждой комнаты хранится отсортированный по дате заезда список
+    полуинтервалов [check_in, check_out). Так как бронирования одной комнаты
+    не пересекаются, даты выезда в списке тоже упорядочены, и проверка
+    свободности сводится к одному бинарному поиску.
+
+    Индекс живёт в памяти процесса и даёт только подсказку: изменения других
+    реплик подтягиваются периодическим прогревом, поэтому занятость по
+    индексу подтверждается в базе данных, источнике истины. Изменения,
+    сделанные во время прогрева, записываются в журнал и применяются к
+    прочитанному снимку.
+    """
+
+    def __init__(self):
+        """Инициализация пустого индекса."""
+        self._starts: dict[UUID, list[date]] = {}
+        self._intervals: dict[UUID, list[tuple[date, date, UUID]]] = {}
+        self._booking_rooms: dict[UUID, UUID] = {}
+        # Изменения, сделанные во время прогрева (None — прогрев не идёт)
+        self._journal: list[tuple[str, tuple]] | None = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        """Количество бронирований в индексе."""
+        return len(self._booking_rooms)
+
+    def add(self, booking_id: UUID, room_id: UUID, check_in: date, check_out: date) -> None:
+        """
+        Добавляет бронирование в индекс.
+
+        Args:
+            booking_id: UUID бронирования
+            room_id: UUID комнаты
+            check_in: Дата заезда
+            check_out: Дата выезда
+        """
+        if self._journal is not None:
+            self._journal.append(("add", (booking_id, room_id, check_in, check_out)))
+        if booking_id in self._booking_rooms:
+            return
+        starts = self._starts.setdefault(room_id, [])
+        intervals = self._intervals.setdefault(room_id, [])
+        position = bisect_left(starts, check_in)
+        starts.insert(position, check_in)
+        intervals.insert(position, (check_in, check_out, booking_id))
+        self._booking_rooms[booking_id] = room_id
+
+    def remove(self, booking_id: UUID) -> None:
+        """
+        Удаляет бронирование из индекса.
+
+        Args:
+            booking_id: UUID бронирования
+        """
+        if self._journal is not None:
+            self._journal.append(("remove", (booking_id,)))
+        room_id = self._booking_rooms.pop(booking_id, None)
+        if room_id is None:
+            return
+        intervals = self._intervals[room_id]
+        for position, (_, _, indexed_id) in enumerate(intervals):
+            if indexed_id == booking_id:
+                del intervals[position]
+                del self._starts[room_id][position]
+                break
+
+    def drop_room(self, room_id: UUID) -> None:
+        """
+        Удаляет из индекса все бронирования комнаты.
+
+        Args:
+            room_id: UUID комнаты
+        """
+        if self._journal is not None:
+            self._journal.append(("drop_room", (room_id,)))
+        self._starts.pop(room_id, None)
+        for _, _, booking_id in self._intervals.pop(room_id, []):
+            self._booking_rooms.pop(booking_id, None)
+
+    def conflicts(self, room_id: UUID, check_in: date, check_out: date) -> list[UUID]:
+        """
+        Возвращает бронирования комнаты, пересекающие [check_in, check_out).
+
+        Args:
+            room_id: UUID комнаты
+            check_in: Дата заезда
+            check_out: Дата выезда
+
+        Returns:
+            list[UUID]: UUID пересекающихся бронирований
+        """
+        starts = self._starts.get(room_id)
+        if not starts:
+            return []
+        intervals = self._intervals[room_id]
+
+        # Кандидаты на пересечение — интервалы, начинающиеся раньше check_out;
+        # у последнего из них самая поздняя дата выезда
+        found = []
+        position = bisect_left(starts, check_out) - 1
+        while position >= 0 and intervals[position][1] > check_in:
+            found.append(intervals[position][2])
+            position -= 1
+        return found
+
+    async def warm(self, db: AsyncSession) -> None:
+        """
+        Заполняет индекс бронированиями из базы данных.
+
+        Изменения индекса, сделанные во время чтения, повторяются поверх
+        прочитанного снимка: add и remove идемпотентны, поэтому изменение,
+        уже попавшее в снимок, применяется без вреда.
+
+        Args:
+            db: Сессия базы данных
+        """
+        snapshot = RoomAvailabilityIndex()
+        self._journal = []
+        try:
+            result = await db.stream(
+                select(
+                    Booking.id,
+                    Booking.room_id,
+                    Booking.check_in_date,
+                    Booking.check_out_date,
+                ).order_by(Booking.room_id, Booking.check_in_date)
+            )
+            async for booking_id, room_id, check_in, check_out in result:
+                snapshot._starts.setdefault(room_id, []).append(check_in)
+                snapshot._intervals.setdefault(room_id, []).append((check_in, check_out, booking_id))
+                snapshot._booking_rooms[booking_id] = room_id
+
+            for operation, args in self._journal:
+                getattr(snapshot, operation)(*args)
+        finally:
+            self._journal = None
+
+        # Подменяем содержимое целиком, чтобы запросы не видели пустой индекс
+        self._starts = snapshot._starts
+        self._intervals = snapshot._intervals
+        self._booking_rooms = snapshot._booking_rooms
+        self.ready = True
+        logger.info(f"Availability index warmed: {len(self)} bookings")
+
+    async def refresh_periodically(self, session_factory, interval: float) -> None:
+        """
+        Периодически перечитывает индекс из базы данных.
+
+        Args:
+            session_factory: Фабрика асинхронных сессий
+            interval: Интервал между прогревами в секундах
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as session:
+                    await self.warm(session)
+            except Exception as e:
+                logger.error(f"Failed to refresh availability index: {e}")
+
+
+# Глобальный индекс занятости
+availability_index = RoomAvailabilityIndex()
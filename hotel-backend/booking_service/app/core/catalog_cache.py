@@ -0,0 +1,224 @@
+"""Кэш готовых ответов каталога отелей и комнат."""
+
+import json
+import logging
+from uuid import uuid4
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from common.cache import CacheBackend, InMemoryCacheBackend
+from common.http_cache import etag_matches, not_modified, weak_etag
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPE = "application/json"
+
+# Пространства ключей списка отелей без комнат и с комнатами (include=rooms)
+HOTELS_NAMESPACE = "hotels"
+HOTELS_WITH_ROOMS_NAMESPACE = "hotels_with_rooms"
+
+
+def hotel_rooms_namespace(hotel_id) -> str:
+    """Пространство ключей списка комнат отеля."""
+    return f"hotel:{hotel_id}:rooms"
+
+
+def room_namespace(room_id) -> str:
+    """Пространство ключей одной комнаты."""
+    return f"room:{room_id}"
+
+
+class CatalogCache:
+    """
+    Кэш сериализованных ответов с инвалидацией по пространствам ключей.
+
+    У каждого пространства есть текущая версия, которая входит в ключи
+    записей. Инвалидация заменяет версию, и все записи пространства (любые
+    страницы и параметры) становятся недостижимыми и вытесняются по TTL/LRU.
+    Потеря версии при вытеснении безопасна: создаётся новая, и записи
+    со старой версией больше не читаются.
+
+    Ключ вычисляется до чтения из БД и используется для записи: если между
+    чтением и записью пространство инвалидировали, устаревший ответ
+    сохранится под старой версией и не будет прочитан.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float, enabled: bool = True):
+        """
+        Инициализация кэша.
+
+        Args:
+            backend: Хранилище значений
+            ttl: Время жизни записей в секундах
+            enabled: Включён ли кэш
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled and ttl > 0
+
+    async def _version(self, namespace: str) -> str:
+        """Возвращает текущую версию пространства, создавая её при отсутствии."""
+        key = f"catalog:version:{namespace}"
+        version = await self.backend.get(key)
+        if version is None:
+            version = uuid4().hex.encode()
+            # Версия живёт дольше записей, чтобы не терять их раньше времени
+            await self.backend.set(key, version, ttl=self.ttl * 10)
+        return version.decode()
+
+    async def version(self, namespace: str) -> str | None:
+        """
+        Возвращает текущую версию пространства.
+
+        Версия меняется при каждой инвалидации пространства, поэтому её можно
+        включать в ETag ответов, зависящих от данных каталога.
+
+        Args:
+            namespace: Пространство ключей
+
+        Returns:
+            str | None: Версия или None, если кэш выключен или недоступен
+        """
+        if not self.enabled:
+            return None
+        try:
+            return await self._version(namespace)
+        except Exception as e:
+            logger.warning(f"Catalog cache read failed: {e}")
+            return None
+
+    async def key(self, namespace: str, params: tuple = ()) -> str | None:
+        """
+        Формирует ключ записи с текущей версией пространства.
+
+        Args:
+            namespace: Пространство ключей
+            params: Параметры запроса, влияющие на ответ
+
+        Returns:
+            str | None: Ключ или None, если кэш выключен или недоступен
+        """
+        version = await self.version(namespace)
+        if version is None:
+            return None
+        return f"catalog:{namespace}:{version}:{json.dumps(params, default=str)}"
+
+    async def get(self, key: str | None) -> Response | None:
+        """
+        Возвращает закэшированный ответ.
+
+        Args:
+            key: Ключ, полученный от key()
+
+        Returns:
+            Response | None: Готовый ответ или None при промахе
+        """
+        if key is None:
+            return None
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Catalog cache read failed: {e}")
+            return None
+        if value is None:
+            return None
+        raw_headers, body = value.split(b"\n", 1)
+        return Response(content=body, media_type=MEDIA_TYPE, headers=json.loads(raw_headers))
+
+    async def set(
+        self,
+        key: str | None,
+        body: bytes,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        """
+        Сохраняет сериализованный ответ.
+
+        Args:
+            key: Ключ, полученный от key() до чтения данных
+            body: Тело ответа в JSON
+            headers: Заголовки ответа, которые нужно сохранить
+        """
+        if key is None:
+            return
+        value = json.dumps(headers or {}).encode() + b"\n" + body
+        try:
+            await self.backend.set(key, value, ttl=self.ttl)
+        except Exception as e:
+            logger.warning(f"Catalog cache write failed: {e}")
+
+    async def lookup(self, request: Request, key: str | None) -> Response | None:
+        """
+        Возвращает закэшированный ответ или 304, если у клиента актуальный ETag.
+
+        Args:
+            request: Входящий запрос
+            key: Ключ, полученный от key()
+
+        Returns:
+            Response | None: Ответ из кэша, 304 или None при промахе
+        """
+        cached = await self.get(key)
+        if cached is not None and etag_matches(request, cached.headers.get("etag")):
+            return not_modified(cached.headers)
+        return cached
+
+    async def respond(
+        self,
+        request: Request,
+        key: str | None,
+        body: bytes,
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        """
+        Сохраняет ответ в кэш и возвращает его с ETag и Cache-Control.
+
+        Args:
+            request: Входящий запрос
+            key: Ключ, полученный от key() до чтения данных
+            body: Тело ответа в JSON
+            headers: Дополнительные заголовки ответа
+
+        Returns:
+            Response: Полный ответ или 304, если у клиента актуальный ETag
+        """
+        headers = {
+            **(headers or {}),
+            "ETag": weak_etag(body),
+            "Cache-Control": settings.CATALOG_CACHE_CONTROL,
+        }
+        await self.set(key, body, headers)
+        if etag_matches(request, headers["ETag"]):
+            return not_modified(headers)
+        return Response(content=body, media_type=MEDIA_TYPE, headers=headers)
+
+    async def invalidate(self, *namespaces: str) -> None:
+        """
+        Инвалидирует все записи указанных пространств.
+
+        Args:
+            namespaces: Пространства ключей
+        """
+        if not self.enabled:
+            return
+        for namespace in namespaces:
+            try:
+                await self.backend.delete(f"catalog:version:{namespace}")
+            except Exception as e:
+                logger.warning(f"Catalog cache invalidation failed for {namespace}: {e}")
+
+    def stats(self) -> dict[str, int]:
+        """Возвращает статистику хранилища."""
+        return self.backend.stats()
+
+
+# Глобальный кэш каталога
+catalog_cache = CatalogCache(
+    backend=InMemoryCacheBackend(
+        maxsize=settings.CATALOG_CACHE_SIZE,
+        ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+    ),
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+    enabled=settings.CATALOG_CACHE_ENABLED,
+)
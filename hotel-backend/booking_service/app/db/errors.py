@@ -0,0 +1,26 @@
+"""Разбор ошибок PostgreSQL."""
+
+from sqlalchemy.exc import DBAPIError
+
+# Коды SQLSTATE, которые обрабатываются сервисом
+FOREIGN_KEY_VIOLATION = "23503"
+EXCLUSION_VIOLATION = "23P01"
+SERIALIZATION_FAILURE = "40001"
+DEADLOCK_DETECTED = "40P01"
+
+# Ошибки, после которых транзакцию можно безопасно повторить
+RETRYABLE_SQLSTATES = {SERIALIZATION_FAILURE, DEADLOCK_DETECTED}
+
+
+def get_sqlstate(error: DBAPIError) -> str | None:
+    """
+    Возвращает код SQLSTATE ошибки драйвера.
+
+    Args:
+        error: Ошибка SQLAlchemy, обёрнутая вокруг ошибки драйвера
+
+    Returns:
+        str | None: Код SQLSTATE или None, если он неизвестен
+    """
+    original = error.orig
+    return getattr(original, "sqlstate", None) or getattr(original, "pgcode", None)
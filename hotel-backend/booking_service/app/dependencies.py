@@ -1,13 +1,17 @@
 """Зависимости FastAPI."""
 
+import hashlib
 import logging
+import time
 from typing import Annotated
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
-from app.security.jwt import decode_access_token
+from app.core.config import settings
+from app.security.jwt import decode_access_token_claims
+from common.cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +32,44 @@ class CurrentUser:
         self.id = user_id
 
 
+# Кэш проверенных токенов: sha256 токена -> CurrentUser
+token_cache: TTLCache[bytes, CurrentUser] = TTLCache(
+    maxsize=settings.JWT_CACHE_SIZE,
+    ttl=settings.JWT_CACHE_TTL_SECONDS,
+)
+
+
+def authenticate_token(token: str) -> CurrentUser | None:
+    """
+    Проверяет токен, используя кэш ранее проверенных токенов.
+
+    Запись кэша живёт до истечения токена, но не дольше JWT_CACHE_TTL_SECONDS.
+    Невалидные токены не кэшируются.
+
+    Args:
+        token: JWT токен
+
+    Returns:
+        CurrentUser | None: Пользователь или None если токен невалиден
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    user = token_cache.get(key)
+    if user is not None:
+        return user
+
+    claims = decode_access_token_claims(token)
+    if claims is None:
+        return None
+
+    user_id, expires_at = claims
+    user = CurrentUser(user_id=user_id)
+    ttl = settings.JWT_CACHE_TTL_SECONDS
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    token_cache.set(key, user, ttl=ttl)
+    return user
+
+
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
 ) -> CurrentUser:
@@ -43,10 +85,9 @@ async def get_current_user(
     Raises:
         HTTPException: Если токен невалиден
     """
-    token = credentials.credentials
-    user_id = decode_access_token(token)
+    user = authenticate_token(credentials.credentials)
 
-    if user_id is None:
+    if user is None:
         logger.warning("Invalid token provided")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -54,5 +95,27 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    return CurrentUser(user_id=user_id)
+    return user
 
+
+async def get_admin_user(
+    current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> CurrentUser:
+    """
+    Зависимость, пропускающая только администраторов (ADMIN_USER_IDS).
+
+    Args:
+        current_user: Текущий пользователь
+
+    Returns:
+        CurrentUser: Пользователь-администратор
+
+    Raises:
+        HTTPException: Если пользователь не администратор
+    """
+    if current_user.id not in settings.admin_user_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator access required",
+        )
+    return current_user
@@ -1,17 +1,26 @@
 """FastAPI приложение для booking-service."""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from app.api.routes_bookings import router as bookings_router
 from app.api.routes_hotels import router as hotels_router
 from app.api.routes_rooms import router as rooms_router
+from app.core.availability import availability_index
+from app.core.catalog_cache import catalog_cache
 from app.core.config import settings
-from app.db.session import engine
+from app.db.session import AsyncSessionLocal, engine
+from app.dependencies import token_cache
+from common.db import pool_stats
+from common.health import ReadinessProbe, database_check, log_handler_check, setup_health
 from common.messaging.rabbit_handler import RabbitMQHandler
+from common.metrics import gauges, setup_metrics
+from common.pagination import NEXT_CURSOR_HEADER, InvalidCursorError
 
 # Настройка логирования
 logging.basicConfig(
@@ -21,11 +30,21 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Подключаем отправку логов в RabbitMQ
+handler: RabbitMQHandler | None = None
 try:
     handler = RabbitMQHandler(
         url=settings.RABBITMQ_URL,
         queue_name=settings.RABBITMQ_QUEUE,
         service_name="booking_service",
+        buffer_size=settings.LOG_PUBLISH_BUFFER_SIZE,
+        batch_size=settings.LOG_PUBLISH_BATCH_SIZE,
+        flush_interval=settings.LOG_PUBLISH_FLUSH_INTERVAL_MS / 1000,
+        exchange=settings.RABBITMQ_LOG_EXCHANGE,
+        spill_path=settings.LOG_SPILL_PATH,
+        spill_max_bytes=settings.LOG_SPILL_MAX_BYTES,
+        breaker_backoff=settings.LOG_PUBLISH_BREAKER_BACKOFF_SECONDS,
+        breaker_max_backoff=settings.LOG_PUBLISH_BREAKER_MAX_BACKOFF_SECONDS,
+        replay_rate=settings.LOG_SPILL_REPLAY_RATE,
     )
     logging.getLogger().addHandler(handler)
 except Exception as e:
@@ -43,14 +62,32 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Booking Service...")
     logger.info(f"Database URL: {settings.DATABASE_URL.split('@')[1] if '@' in settings.DATABASE_URL else 'configured'}")
+
+    # Прогрев индекса занятости комнат
+    try:
+        async with AsyncSessionLocal() as session:
+            await availability_index.warm(session)
+    except Exception as e:
+        logger.error(f"Failed to warm availability index: {e}")
+    refresh_task = asyncio.create_task(
+        availability_index.refresh_periodically(
+            AsyncSessionLocal,
+            settings.AVAILABILITY_INDEX_REFRESH_SECONDS,
+        )
+    )
     
     yield
     
     # Shutdown
     logger.info("Shutting down Booking Service...")
+    refresh_task.cancel()
     await engine.dispose()
     logger.info("Database connections closed")
 
+    # Досылаем накопленные логи и закрываем соединение с RabbitMQ
+    if handler is not None:
+        await handler.aclose()
+
 
 # Создание FastAPI приложения
 app = FastAPI(
@@ -68,7 +105,47 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
+)
+
+# Метрики Prometheus на /metrics
+metrics_registry = setup_metrics(app, engine)
+metrics_registry.register_collector(
+    lambda: [
+        *gauges("db_pool", "DB connection pool", pool_stats(engine)),
+        *gauges("jwt_cache", "Verified JWT cache", token_cache.stats()),
+        *gauges("catalog_cache", "Catalog response cache", catalog_cache.stats()),
+        *gauges("log_publisher", "RabbitMQ log publisher", handler.stats() if handler else {}),
+    ]
+)
+
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    """
+    Преобразует некорректный курсор пагинации в ответ 400.
+
+    Args:
+        request: Входящий запрос
+        exc: Ошибка разбора курсора
+
+    Returns:
+        JSONResponse: Ответ с описанием ошибки
+    """
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
+
+# Проверки готовности /readyz и живости /livez. Отправка логов не критична:
+# записи копятся в буфере обработчика до восстановления RabbitMQ
+readiness_probe = ReadinessProbe(
+    timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+    cache_seconds=settings.HEALTH_CHECK_CACHE_SECONDS,
 )
+readiness_probe.add("database", database_check(engine))
+readiness_probe.add("rabbitmq_log_handler", log_handler_check(handler), critical=False)
+setup_health(app, readiness_probe)
 
 # Подключение роутеров
 app.include_router(hotels_router)
@@ -99,7 +176,11 @@ async def health_check():
     Returns:
         dict: Статус здоровья сервиса
     """
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "jwt_cache": token_cache.stats(),
+        "db_pool": pool_stats(engine),
+    }
 
 
 if __name__ == "__main__":
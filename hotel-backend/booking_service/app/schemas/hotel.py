@@ -5,6 +5,8 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field
 
+from app.schemas.room import RoomResponse
+
 
 class HotelBase(BaseModel):
     """Базовая схема отеля."""
@@ -41,3 +43,8 @@ class HotelResponse(HotelBase):
 
         from_attributes = True
 
+
+class HotelWithRoomsResponse(HotelResponse):
+    """Схема ответа с информацией об отеле и его комнатах."""
+
+    rooms: list[RoomResponse]
@@ -1,9 +1,10 @@
 """Pydantic схемы для комнаты."""
 
 from decimal import Decimal
+from typing import Any, Literal
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class RoomBase(BaseModel):
@@ -41,3 +42,41 @@ class RoomResponse(RoomBase):
 
         from_attributes = True
 
+
+class RoomBatchUpdate(RoomUpdate):
+    """Элемент пакетного обновления комнат."""
+
+    id: UUID = Field(..., description="ID комнаты")
+
+    @model_validator(mode="after")
+    def validate_required_fields(self) -> "RoomBatchUpdate":
+        """
+        Запрещает явный null для обязательных полей комнаты.
+
+        Returns:
+            RoomBatchUpdate: Экземпляр схемы
+
+        Raises:
+            ValueError: Если обязательному полю передан null
+        """
+        for field in ("room_number", "room_type", "price_per_night"):
+            if field in self.model_fields_set and getattr(self, field) is None:
+                raise ValueError(f"{field} cannot be null")
+        return self
+
+
+class RoomBatchItemResult(BaseModel):
+    """Результат обработки одного элемента пакета."""
+
+    index: int = Field(..., description="Позиция элемента в запросе")
+    status: Literal["created", "updated", "invalid", "not_found"]
+    room: RoomResponse | None = None
+    errors: list[dict[str, Any]] | None = None
+
+
+class RoomBatchResponse(BaseModel):
+    """Схема ответа на пакетный запрос."""
+
+    succeeded: int
+    failed: int
+    results: list[RoomBatchItemResult]
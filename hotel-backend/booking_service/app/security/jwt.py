@@ -7,15 +7,16 @@ from jose import JWTError, jwt
 from app.core.config import settings
 
 
-def decode_access_token(token: str) -> UUID | None:
+def decode_access_token_claims(token: str) -> tuple[UUID, float | None] | None:
     """
-    Декодирует и валидирует JWT токен.
+    Декодирует и валидирует JWT токен, возвращая также время его истечения.
 
     Args:
         token: JWT токен
 
     Returns:
-        UUID | None: UUID пользователя из токена или None если токен невалиден
+        tuple[UUID, float | None] | None: UUID пользователя и exp (unix-время)
+            или None если токен невалиден
     """
     try:
         payload = jwt.decode(
@@ -26,7 +27,22 @@ def decode_access_token(token: str) -> UUID | None:
         user_id: str = payload.get("sub")
         if user_id is None:
             return None
-        return UUID(user_id)
-    except (JWTError, ValueError):
+        exp = payload.get("exp")
+        return UUID(user_id), float(exp) if exp is not None else None
+    except (JWTError, ValueError, TypeError):
         return None
 
+
+def decode_access_token(token: str) -> UUID | None:
+    """
+    Декодирует и валидирует JWT токен.
+
+    Args:
+        token: JWT токен
+
+    Returns:
+        UUID | None: UUID пользователя из токена или None если токен невалиден
+    """
+    claims = decode_access_token_claims(token)
+    return claims[0] if claims is not None else None
+
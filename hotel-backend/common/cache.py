@@ -0,0 +1,172 @@
+"""Кэши с TTL: LRU-кэш в памяти процесса и интерфейс подключаемого хранилища."""
+
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[K, V]):
+    """
+    LRU-кэш с временем жизни записей.
+
+    Не потокобезопасен: рассчитан на использование из одного event loop.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Инициализация кэша.
+
+        Args:
+            maxsize: Максимальное количество записей
+            ttl: Время жизни записи по умолчанию в секундах
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Количество записей (включая ещё не вычищенные просроченные)."""
+        return len(self._data)
+
+    def get(self, key: K, default: Any = None) -> V | Any:
+        """
+        Возвращает значение по ключу, если запись существует и не просрочена.
+
+        Args:
+            key: Ключ записи
+            default: Значение, возвращаемое при промахе
+
+        Returns:
+            V | Any: Значение из кэша или default
+        """
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """
+        Сохраняет значение, вытесняя самую давно использованную запись.
+
+        Args:
+            key: Ключ записи
+            value: Значение
+            ttl: Время жизни записи в секундах (по умолчанию ttl кэша)
+        """
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        """
+        Удаляет запись по ключу.
+
+        Args:
+            key: Ключ записи
+        """
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Удаляет все записи."""
+        self._data.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Возвращает размер кэша и счётчики попаданий и промахов."""
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+class CacheBackend(ABC):
+    """
+    Интерфейс хранилища кэша: байтовые значения с TTL.
+
+    Асинхронный интерфейс позволяет подставить сетевое хранилище
+    (Redis-совместимое) вместо кэша в памяти процесса.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """
+        Возвращает значение по ключу.
+
+        Args:
+            key: Ключ
+
+        Returns:
+            bytes | None: Значение или None, если ключа нет или он просрочен
+        """
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """
+        Сохраняет значение.
+
+        Args:
+            key: Ключ
+            value: Значение
+            ttl: Время жизни в секундах
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """
+        Удаляет значение.
+
+        Args:
+            key: Ключ
+        """
+
+    def stats(self) -> dict[str, int]:
+        """Возвращает статистику хранилища (если она доступна)."""
+        return {}
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Хранилище кэша в памяти процесса на основе TTLCache."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        """
+        Инициализация хранилища.
+
+        Args:
+            maxsize: Максимальное количество записей
+            ttl: Время жизни записи по умолчанию в секундах
+        """
+        self._cache: TTLCache[str, bytes] = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> bytes | None:
+        """Возвращает значение по ключу."""
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Сохраняет значение."""
+        self._cache.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        """Удаляет значение."""
+        self._cache.pop(key)
+
+    def stats(self) -> dict[str, int]:
+        """Возвращает размер кэша и счётчики попаданий и промахов."""
+        return self._cache.stats()
@@ -0,0 +1,94 @@
+"""Создание асинхронного engine с настраиваемым и наблюдаемым пулом соединений."""
+
+import time
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from common.config import CommonSettings
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Пул соединений, считающий время ожидания выдачи соединения."""
+
+    def __init__(self, *args, **kwargs):
+        """Инициализация пула и счётчиков ожидания."""
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_seconds_total = 0.0
+        self.checkout_wait_seconds_max = 0.0
+
+    def connect(self):
+        """Выдаёт соединение из пула, замеряя время ожидания."""
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.checkout_wait_seconds_total += waited
+            self.checkout_wait_seconds_max = max(self.checkout_wait_seconds_max, waited)
+
+
+def create_db_engine(url: str, settings: CommonSettings, **kwargs: Any) -> AsyncEngine:
+    """
+    Создаёт асинхронный engine с параметрами пула из настроек сервиса.
+
+    Args:
+        url: URL базы данных
+        settings: Настройки сервиса (наследник CommonSettings)
+        kwargs: Дополнительные аргументы create_async_engine
+
+    Returns:
+        AsyncEngine: Асинхронный engine
+    """
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        future=True,
+        poolclass=InstrumentedAsyncPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={
+            # Кэш подготовленных выражений на каждое соединение asyncpg
+            # (0 — выключен, нужно за PgBouncer в режиме transaction)
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
+        **kwargs,
+    )
+
+
+def pool_stats(engine: AsyncEngine) -> dict[str, Any]:
+    """
+    Возвращает состояние пула соединений engine.
+
+    Args:
+        engine: Асинхронный engine
+
+    Returns:
+        dict[str, Any]: Размер пула, занятые соединения и статистика ожидания
+    """
+    pool = engine.sync_engine.pool
+    stats: dict[str, Any] = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+    if isinstance(pool, InstrumentedAsyncPool):
+        stats.update(
+            checkouts=pool.checkouts,
+            checkout_timeouts=pool.checkout_timeouts,
+            checkout_wait_seconds_total=round(pool.checkout_wait_seconds_total, 6),
+            checkout_wait_seconds_max=round(pool.checkout_wait_seconds_max, 6),
+        )
+    return stats
@@ -0,0 +1,117 @@
+"""Потоковая выгрузка результатов запроса в NDJSON или CSV."""
+
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Literal, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _json_default(value: Any) -> str:
+    """Сериализует значения, которые json не умеет сам (UUID, Decimal, даты)."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _format_ndjson(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> bytes:
+    """Форматирует пачку строк в NDJSON: один JSON-объект на строку."""
+    return "".join(
+        json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False) + "\n"
+        for row in rows
+    ).encode()
+
+
+def _format_csv(rows: Sequence[Sequence[Any]]) -> bytes:
+    """Форматирует пачку строк в CSV."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, (datetime, date)) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+async def stream_rows(
+    session_factory: async_sessionmaker[AsyncSession],
+    query: Select,
+    export_format: ExportFormat,
+    batch_size: int,
+) -> AsyncIterator[bytes]:
+    """
+    Читает результат запроса серверным курсором и отдаёт его пачками байт.
+
+    Сессия открывается внутри генератора: сессия из зависимости get_db
+    закрывается до начала отправки тела ответа. В памяти одновременно
+    находится не больше batch_size строк, независимо от размера выгрузки.
+
+    Args:
+        session_factory: Фабрика сессий сервиса
+        query: Запрос с явным списком колонок
+        export_format: Формат выгрузки
+        batch_size: Число строк, читаемых из курсора за раз
+
+    Yields:
+        bytes: Очередная часть выгрузки
+    """
+    columns = [column.key for column in query.selected_columns]
+    if export_format == "csv":
+        yield _format_csv([columns])
+
+    rows_sent = 0
+    async with session_factory() as session:
+        try:
+            result = await session.stream(query.execution_options(yield_per=batch_size))
+            async for rows in result.partitions():
+                if export_format == "csv":
+                    yield _format_csv(rows)
+                else:
+                    yield _format_ndjson(columns, rows)
+                rows_sent += len(rows)
+        except Exception:
+            # Статус уже отправлен: обрыв соединения сообщает клиенту о неполной выгрузке
+            logger.exception(f"Export failed after {rows_sent} rows")
+            raise
+    logger.info(f"Export finished: {rows_sent} rows")
+
+
+def export_response(
+    session_factory: async_sessionmaker[AsyncSession],
+    query: Select,
+    export_format: ExportFormat,
+    filename: str,
+    batch_size: int,
+) -> StreamingResponse:
+    """
+    Создаёт потоковый ответ с выгрузкой результата запроса.
+
+    Args:
+        session_factory: Фабрика сессий сервиса
+        query: Запрос с явным списком колонок и сортировкой
+        export_format: Формат выгрузки (ndjson или csv)
+        filename: Имя файла без расширения
+        batch_size: Число строк, читаемых из курсора за раз
+
+    Returns:
+        StreamingResponse: Ответ, отдающий строки по мере чтения
+    """
+    return StreamingResponse(
+        stream_rows(session_factory, query, export_format, batch_size),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
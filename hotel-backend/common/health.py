@@ -0,0 +1,196 @@
+"""Проверки живости (/livez) и готовности (/readyz) сервиса."""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from common.messaging.rabbit_handler import RabbitMQHandler
+
+# Функция проверки возвращает подробности для ответа или выбрасывает исключение
+CheckFunc = Callable[[], Awaitable[dict[str, Any] | None]]
+
+
+class CheckFailed(Exception):
+    """Зависимость недоступна или не готова."""
+
+
+class DependencyCheck:
+    """Проверка одной зависимости с таймаутом и кэшированием результата."""
+
+    def __init__(
+        self,
+        name: str,
+        check: CheckFunc,
+        critical: bool = True,
+        timeout: float = 2.0,
+        cache_seconds: float = 2.0,
+    ):
+        """
+        Инициализация проверки.
+
+        Args:
+            name: Имя зависимости в ответе
+            check: Асинхронная функция проверки
+            critical: Делает ли провал проверки сервис неготовым
+            timeout: Таймаут проверки в секундах
+            cache_seconds: Сколько секунд переиспользовать последний результат
+        """
+        self.name = name
+        self.check = check
+        self.critical = critical
+        self.timeout = timeout
+        self.cache_seconds = cache_seconds
+        self._result: dict[str, Any] | None = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def run(self) -> dict[str, Any]:
+        """
+        Возвращает результат проверки, выполняя её не чаще раза в cache_seconds.
+
+        Одновременные запросы ждут одну и ту же проверку, поэтому частый опрос
+        /readyz не создаёт нагрузку на зависимость.
+
+        Returns:
+            dict[str, Any]: Статус, задержка проверки и подробности
+        """
+        async with self._lock:
+            if self._result is not None and time.monotonic() - self._checked_at < self.cache_seconds:
+                return self._result
+
+            started = time.perf_counter()
+            result: dict[str, Any] = {"critical": self.critical}
+            try:
+                details = await asyncio.wait_for(self.check(), self.timeout)
+                result["status"] = "ok"
+                if details:
+                    result.update(details)
+            except asyncio.TimeoutError:
+                result["status"] = "fail"
+                result["error"] = f"timed out after {self.timeout}s"
+            except Exception as e:
+                result["status"] = "fail"
+                result["error"] = str(e) or e.__class__.__name__
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+            self._result = result
+            self._checked_at = time.monotonic()
+            return result
+
+
+class ReadinessProbe:
+    """Набор проверок зависимостей сервиса."""
+
+    def __init__(self, timeout: float = 2.0, cache_seconds: float = 2.0):
+        """
+        Инициализация набора проверок.
+
+        Args:
+            timeout: Таймаут проверки по умолчанию
+            cache_seconds: Время кэширования результата по умолчанию
+        """
+        self.timeout = timeout
+        self.cache_seconds = cache_seconds
+        self.checks: list[DependencyCheck] = []
+
+    def add(self, name: str, check: CheckFunc, critical: bool = True) -> None:
+        """
+        Добавляет проверку зависимости.
+
+        Args:
+            name: Имя зависимости
+            check: Асинхронная функция проверки
+            critical: Делает ли провал проверки сервис неготовым
+        """
+        self.checks.append(
+            DependencyCheck(name, check, critical, self.timeout, self.cache_seconds)
+        )
+
+    async def run(self) -> tuple[bool, dict[str, Any]]:
+        """
+        Выполняет все проверки параллельно.
+
+        Returns:
+            tuple[bool, dict[str, Any]]: Готов ли сервис и результаты по зависимостям
+        """
+        results = await asyncio.gather(*(check.run() for check in self.checks))
+        ready = all(
+            result["status"] == "ok"
+            for check, result in zip(self.checks, results)
+            if check.critical
+        )
+        return ready, {check.name: result for check, result in zip(self.checks, results)}
+
+
+def database_check(engine: AsyncEngine) -> CheckFunc:
+    """
+    Создаёт проверку доступности БД через пул соединений.
+
+    Args:
+        engine: Асинхронный engine
+
+    Returns:
+        CheckFunc: Функция проверки
+    """
+
+    async def check() -> dict[str, Any]:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        pool = engine.sync_engine.pool
+        return {"pool_checked_out": pool.checkedout(), "pool_size": pool.size()}
+
+    return check
+
+
+def log_handler_check(handler: RabbitMQHandler | None) -> CheckFunc:
+    """
+    Создаёт проверку канала отправки логов в RabbitMQ.
+
+    Канал открывается при первой отправке, поэтому отсутствие канала без
+    накопленных записей не считается ошибкой.
+
+    Args:
+        handler: Обработчик логов (None, если не подключён)
+
+    Returns:
+        CheckFunc: Функция проверки
+    """
+
+    async def check() -> dict[str, Any]:
+        if handler is None:
+            raise CheckFailed("log handler is not attached")
+        stats = handler.stats()
+        if not handler.connected and stats["buffered"] > 0:
+            raise CheckFailed(f"channel is closed, {stats['buffered']} records buffered")
+        return {"connected": handler.connected, **stats}
+
+    return check
+
+
+def setup_health(app: FastAPI, probe: ReadinessProbe) -> None:
+    """
+    Добавляет эндпоинты /livez и /readyz.
+
+    Args:
+        app: FastAPI приложение
+        probe: Проверки готовности сервиса
+    """
+
+    @app.get("/livez", tags=["Health"])
+    async def livez():
+        """Процесс жив и обрабатывает запросы (зависимости не проверяются)."""
+        return {"status": "alive"}
+
+    @app.get("/readyz", tags=["Health"])
+    async def readyz():
+        """Сервис готов принимать трафик: все критичные зависимости доступны."""
+        ready, checks = await probe.run()
+        return JSONResponse(
+            status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "ready" if ready else "not_ready", "checks": checks},
+        )
@@ -0,0 +1,71 @@
+"""ETag и условные GET-запросы (If-None-Match -> 304)."""
+
+import hashlib
+from typing import Any, Mapping
+
+from fastapi import Request, Response, status
+
+# Заголовки, которые повторяются в ответе 304
+NOT_MODIFIED_HEADERS = ("etag", "cache-control", "vary")
+
+
+def weak_etag(*parts: Any) -> str:
+    """
+    Строит слабый ETag из значений, определяющих версию ресурса.
+
+    Args:
+        parts: Значения (байты тела, версии, метки времени, параметры запроса)
+
+    Returns:
+        str: ETag вида W/"<hash>"
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\x00")
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str | None) -> bool:
+    """
+    Проверяет, совпадает ли ETag с одним из значений If-None-Match.
+
+    Сравнение слабое: префикс W/ не учитывается.
+
+    Args:
+        request: Входящий запрос
+        etag: Текущий ETag ресурса
+
+    Returns:
+        bool: True, если клиент уже имеет актуальную версию
+    """
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == current
+        for candidate in header.split(",")
+    )
+
+
+def not_modified(headers: Mapping[str, str]) -> Response:
+    """
+    Формирует ответ 304 без тела.
+
+    Args:
+        headers: Заголовки полного ответа (из них берутся ETag и Cache-Control)
+
+    Returns:
+        Response: Ответ 304 Not Modified
+    """
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={
+            name: value
+            for name, value in headers.items()
+            if name.lower() in NOT_MODIFIED_HEADERS
+        },
+    )
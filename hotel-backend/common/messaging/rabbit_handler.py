@@ -3,74 +3,445 @@
 import asyncio
 import json
 import logging
+import os
+import random
+import time
+from collections import deque
+from contextlib import suppress
 from datetime import datetime, timezone
 from typing import Optional
 
-from aio_pika import Message, connect_robust
-from aio_pika.abc import AbstractChannel, AbstractConnection
+from aio_pika import DeliveryMode, ExchangeType, Message, connect_robust
+from aio_pika.abc import AbstractChannel, AbstractConnection, AbstractExchange
+from aiormq.exceptions import PublishError
+
+# Map standard logging levels to 0-3 range expected by logging_service
+LEVEL_MAP = [
+    (logging.ERROR, 3),
+    (logging.WARNING, 2),
+    (logging.INFO, 1),
+    (logging.DEBUG, 0),
+]
+
+
+def map_level(levelno: int) -> int:
+    """Map a standard logging level to the 0-3 range."""
+    for threshold, val in LEVEL_MAP:
+        if levelno >= threshold:
+            return val
+    return 3
 
 
 class RabbitMQHandler(logging.Handler):
-    """Logging handler publishing records to RabbitMQ."""
+    """Logging handler publishing records to RabbitMQ.
+
+    ``emit`` only serialises the record and appends it to a bounded ring
+    buffer. A single background flusher drains the buffer in batches (when
+    ``batch_size`` records are waiting or every ``flush_interval`` seconds)
+    and publishes them over one channel with publisher confirms. When the
+    buffer is full the oldest record is dropped.
 
-    def __init__(self, url: str, queue_name: str, service_name: str):
+    Records go to ``queue_name`` through the default exchange. When
+    ``exchange`` is given they are published to that x-consistent-hash
+    exchange instead, with ``service_name`` as the routing key, so all
+    records of one service land in the same shard queue. Records are
+    published as mandatory: if the broker returns one because no shard queue
+    is bound to the exchange, it is republished to ``queue_name``, which the
+    logging workers always consume, instead of being lost.
+
+    Failed connects or publishes open a circuit breaker. For an exponential,
+    jittered backoff window (``breaker_backoff`` doubling up to
+    ``breaker_max_backoff``) no connection is attempted. When ``spill_path``
+    is set, records that cannot be published go to that append-only file
+    (one JSON body per line, at most ``spill_max_bytes``). When the window
+    ends, the spill is replayed in order at ``replay_rate`` records per
+    second. New records are published directly in the meantime, so a
+    spill backlog never delays them; they may reach the queue before older
+    spilled records, and each record carries its own timestamp. Spill file
+    I/O runs in a worker thread. Each process needs its own spill file.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        queue_name: str,
+        service_name: str,
+        buffer_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        exchange: Optional[str] = None,
+        spill_path: Optional[str] = None,
+        spill_max_bytes: int = 64 * 1024 * 1024,
+        breaker_backoff: float = 1.0,
+        breaker_max_backoff: float = 60.0,
+        replay_rate: float = 1000.0,
+        connect_timeout: float = 5.0,
+    ):
         super().__init__()
         self.url = url
         self.queue_name = queue_name
+        self.exchange_name = exchange or None
         self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
         self._connection: Optional[AbstractConnection] = None
         self._channel: Optional[AbstractChannel] = None
-        self._lock = asyncio.Lock()
+        self._exchange: Optional[AbstractExchange] = None
+        self._buffer: deque[bytes] = deque(maxlen=buffer_size)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._closed = False
 
-    async def _ensure_channel(self):
-        if self._connection and not self._connection.is_closed:
+        # Circuit breaker
+        self.breaker_backoff = breaker_backoff
+        self.breaker_max_backoff = breaker_max_backoff
+        self.connect_timeout = connect_timeout
+        self._failures = 0
+        self._open_until = 0.0
+
+        # Spill file: records before _spill_offset are already replayed
+        self.spill_path = spill_path or None
+        self.spill_max_bytes = spill_max_bytes
+        self.replay_rate = replay_rate
+        self._spill_size = 0
+        self._spill_offset = 0
+        self._replay_at = 0.0
+        if self.spill_path:
+            self._open_spill()
+
+        # Counters
+        self.published = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.replayed = 0
+        self.returned = 0
+
+    @property
+    def buffered(self) -> int:
+        """Number of records waiting in the buffer."""
+        return len(self._buffer)
+
+    @property
+    def connected(self) -> bool:
+        """Whether the publishing channel is open (it is opened lazily on first flush)."""
+        return self._channel is not None and not self._channel.is_closed
+
+    @property
+    def circuit_open(self) -> bool:
+        """Whether publishing is suspended after a broker failure."""
+        return time.monotonic() < self._open_until
+
+    @property
+    def spill_pending_bytes(self) -> int:
+        """Bytes in the spill file that are not replayed yet."""
+        return self._spill_size - self._spill_offset
+
+    def stats(self) -> dict[str, int]:
+        """Return buffer, publish, spill and circuit breaker counters."""
+        return {
+            "buffered": self.buffered,
+            "published": self.published,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "replayed": self.replayed,
+            "returned": self.returned,
+            "spill_pending_bytes": self.spill_pending_bytes,
+            "circuit_open": int(self.circuit_open),
+        }
+
+    def _open_spill(self) -> None:
+        """Pick up a spill file (and its replay offset) left by a previous run."""
+        directory = os.path.dirname(self.spill_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with suppress(OSError):
+            self._spill_size = os.path.getsize(self.spill_path)
+        with suppress(OSError, ValueError):
+            with open(self.spill_path + ".offset") as offset_file:
+                self._spill_offset = min(int(offset_file.read()), self._spill_size)
+
+    def _append_spill(self, data: bytes) -> int:
+        """Append data to the spill file and return its new size (runs in a worker thread)."""
+        with open(self.spill_path, "ab") as spill_file:
+            spill_file.write(data)
+            return spill_file.tell()
+
+    def _read_spill(self, offset: int, limit: int) -> tuple[list[bytes], int]:
+        """Read up to ``limit`` records after ``offset`` and return the offset past them (runs in a worker thread)."""
+        records = []
+        with open(self.spill_path, "rb") as spill_file:
+            spill_file.seek(offset)
+            while len(records) < limit:
+                line = spill_file.readline()
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                if len(line) > 1:
+                    records.append(line[:-1])
+        return records, offset
+
+    def _store_spill_offset(self, offset: int) -> bool:
+        """Persist the replay offset, or truncate the file once it is fully replayed (runs in a worker thread)."""
+        offset_path = self.spill_path + ".offset"
+        # Сравниваем с фактическим размером: в файл могли дописать после чтения
+        if offset >= os.path.getsize(self.spill_path):
+            with open(self.spill_path, "wb"):
+                pass
+            with suppress(FileNotFoundError):
+                os.remove(offset_path)
+            return True
+        with open(offset_path, "w") as offset_file:
+            offset_file.write(str(offset))
+        return False
+
+    async def _spill(self, records: list[bytes]) -> None:
+        """Append records to the spill file; what does not fit is dropped."""
+        if not records:
             return
-        self._connection = await connect_robust(self.url)
-        self._channel = await self._connection.channel()
-        await self._channel.declare_queue(self.queue_name, durable=True)
+        room = self.spill_max_bytes - self._spill_size
+        accepted = []
+        for body in records:
+            if len(body) + 1 > room:
+                break
+            accepted.append(body)
+            room -= len(body) + 1
+        self.dropped += len(records) - len(accepted)
+        if not accepted:
+            return
+        data = b"\n".join(accepted) + b"\n"
+        try:
+            self._spill_size = await asyncio.to_thread(self._append_spill, data)
+        except OSError:
+            self.dropped += len(accepted)
+            return
+        self.spilled += len(accepted)
 
-    async def _publish(self, record: logging.LogRecord):
+    async def _advance_spill(self, offset: int) -> None:
+        """Move the replay offset past published records."""
         try:
-            async with self._lock:
-                await self._ensure_channel()
-            # Map standard logging levels to 0-3 range expected by logging_service
-            level_map = [
-                (logging.ERROR, 3),
-                (logging.WARNING, 2),
-                (logging.INFO, 1),
-                (logging.DEBUG, 0),
-            ]
-            mapped_level = 3
-            for threshold, val in level_map:
-                if record.levelno >= threshold:
-                    mapped_level = val
-                    break
+            replayed_all = await asyncio.to_thread(self._store_spill_offset, offset)
+        except OSError:
+            # Смещение сохранится при следующем продвижении
+            replayed_all = False
+        if replayed_all:
+            self._spill_size = 0
+            self._spill_offset = 0
+        else:
+            self._spill_offset = offset
 
-            payload = {
-                "level": mapped_level,
-                "message": record.getMessage(),
-                "service_name": self.service_name,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
-            body = json.dumps(payload).encode()
-            await self._channel.default_exchange.publish(
-                Message(body=body, delivery_mode=2),
-                routing_key=self.queue_name,
+    def _take_buffer(self, limit: Optional[int] = None) -> list[bytes]:
+        count = len(self._buffer) if limit is None else min(limit, len(self._buffer))
+        return [self._buffer.popleft() for _ in range(count)]
+
+    async def _requeue(self, records: list[bytes]) -> None:
+        """Keep records that could not be published: spill them or put them back in the buffer."""
+        if self.spill_path:
+            await self._spill(records)
+            return
+        overflow = len(self._buffer) + len(records) - self._buffer.maxlen
+        if overflow > 0:
+            # Буфер полон: отбрасываем самые старые записи, как emit
+            self.dropped += overflow
+            records = records[overflow:]
+        self._buffer.extendleft(reversed(records))
+
+    async def _trip(self) -> None:
+        """Open the circuit and drop the connection until the backoff window ends."""
+        self._failures += 1
+        backoff = min(self.breaker_max_backoff, self.breaker_backoff * 2 ** (self._failures - 1))
+        # Случайный разброс, чтобы процессы не переподключались одновременно после рестарта брокера
+        self._open_until = time.monotonic() + backoff * random.uniform(0.5, 1.0)
+        connection, self._connection = self._connection, None
+        self._channel = None
+        if connection is not None and not connection.is_closed:
+            with suppress(Exception):
+                await asyncio.wait_for(connection.close(), self.connect_timeout)
+
+    async def _connect(self):
+        if self._connection is None or self._connection.is_closed:
+            self._connection = await connect_robust(self.url)
+        # Returned (unroutable) messages fail their publish with PublishError
+        self._channel = await self._connection.channel(publisher_confirms=True, on_return_raises=True)
+        await self._channel.declare_queue(self.queue_name, durable=True)
+        if self.exchange_name:
+            # Shard queues are declared and bound by the logging workers
+            self._exchange = await self._channel.declare_exchange(
+                self.exchange_name,
+                ExchangeType.X_CONSISTENT_HASH,
+                durable=True,
             )
+        else:
+            self._exchange = self._channel.default_exchange
+
+    async def _ensure_channel(self):
+        if self._channel and not self._channel.is_closed:
+            return
+        await asyncio.wait_for(self._connect(), self.connect_timeout)
+
+    @staticmethod
+    async def _publish_all(exchange: AbstractExchange, routing_key: str, batch: list[bytes]) -> list:
+        # Публикации идут конвейером, подтверждения ждём для всей пачки сразу
+        return await asyncio.gather(
+            *(
+                exchange.publish(
+                    Message(body=body, delivery_mode=DeliveryMode.PERSISTENT),
+                    routing_key=routing_key,
+                    mandatory=True,
+                )
+                for body in batch
+            ),
+            return_exceptions=True,
+        )
+
+    async def _publish_batch(self, batch: list[bytes]) -> list[bytes]:
+        """Publish a batch and return the records that failed."""
+        try:
+            await self._ensure_channel()
+            if self.exchange_name:
+                results = await self._publish_all(self._exchange, self.service_name, batch)
+                returned = [
+                    index for index, result in enumerate(results) if isinstance(result, PublishError)
+                ]
+                if returned:
+                    # К exchange не привязана ни одна очередь шарда — публикуем в общую очередь
+                    self.returned += len(returned)
+                    fallback = await self._publish_all(
+                        self._channel.default_exchange,
+                        self.queue_name,
+                        [batch[index] for index in returned],
+                    )
+                    for index, result in zip(returned, fallback):
+                        results[index] = result
+            else:
+                results = await self._publish_all(self._exchange, self.queue_name, batch)
+        except asyncio.CancelledError:
+            # Возвращаем пачку в начало буфера, чтобы дослать её при закрытии
+            self._buffer.extendleft(reversed(batch))
+            raise
         except Exception:
-            # Do not propagate exceptions to the logging system
-            self.handleError(record)
+            await self._trip()
+            return batch
+
+        failed = [
+            body
+            for body, result in zip(batch, results)
+            if isinstance(result, BaseException)
+        ]
+        self.published += len(batch) - len(failed)
+        if failed:
+            await self._trip()
+        else:
+            self._failures = 0
+        return failed
+
+    async def _replay_batch(self) -> None:
+        """Publish the next batch from the spill file and schedule the next one at ``replay_rate``."""
+        try:
+            records, offset = await asyncio.to_thread(self._read_spill, self._spill_offset, self.batch_size)
+        except OSError:
+            records, offset = [], self._spill_size
+        if records:
+            failed = await self._publish_batch(records)
+            if failed:
+                # Смещение не сдвигаем: пачка будет повторена целиком (at-least-once)
+                return
+            self.replayed += len(records)
+            if self.replay_rate > 0:
+                self._replay_at = time.monotonic() + len(records) / self.replay_rate
+        elif offset == self._spill_offset:
+            # Незавершённая последняя строка (запись прервалась) — отбрасываем хвост
+            offset = self._spill_size
+        await self._advance_spill(offset)
+
+    async def _drain(self, replay: bool = True) -> None:
+        while self._buffer or (replay and self.spill_pending_bytes):
+            if self.circuit_open:
+                if self.spill_path:
+                    await self._spill(self._take_buffer())
+                return
+            if self._buffer:
+                # Новые записи публикуются сразу, не дожидаясь воспроизведения spill-файла
+                failed = await self._publish_batch(self._take_buffer(self.batch_size))
+                await self._requeue(failed)
+            if not (replay and self.spill_pending_bytes) or self.circuit_open:
+                continue
+            delay = self._replay_at - time.monotonic()
+            if delay <= 0:
+                await self._replay_batch()
+            elif not self._buffer:
+                # Ждём очередной пачки spill-файла или заполнения буфера
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                self._wakeup.clear()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            if len(self._buffer) < self.batch_size or self.circuit_open:
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            self._wakeup.clear()
+            await self._drain()
+
+    def _start_flusher(self, loop: asyncio.AbstractEventLoop) -> None:
+        if (
+            self._flusher is not None
+            and not self._flusher.done()
+            and self._flusher.get_loop() is loop
+        ):
+            return
+        self._wakeup = asyncio.Event()
+        self._flusher = loop.create_task(self._flush_loop())
+
+    async def aclose(self) -> None:
+        """Stop the flusher, publish what is left and close the connection."""
+        self._closed = True
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        # Не ждём брокер при остановке: записи остаются в spill-файле до перезапуска
+        await self._drain(replay=False)
+        if self._buffer:
+            self.dropped += len(self._buffer)
+            self._buffer.clear()
+        if self._connection and not self._connection.is_closed:
+            await self._connection.close()
+        self._connection = None
+        self._channel = None
 
     def emit(self, record: logging.LogRecord) -> None:
+        if self._closed:
+            return
         # Шумные системные логгеры — не отправляем в очередь
         if record.name.startswith(("aio_pika", "aiormq")):
             return
-        msg = record.getMessage()
-        if "bcrypt version" in msg:
+        try:
+            msg = record.getMessage()
+            if "bcrypt version" in msg:
+                return
+            payload = {
+                "level": map_level(record.levelno),
+                "message": msg,
+                "service_name": self.service_name,
+                "timestamp": datetime.fromtimestamp(
+                    record.created, tz=timezone.utc
+                ).isoformat(),
+            }
+            body = json.dumps(payload).encode()
+        except Exception:
+            self.handleError(record)
             return
 
-        loop = asyncio.get_event_loop()
-        if loop.is_closed():
-            return
-        loop.create_task(self._publish(record))
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(body)
 
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Вне event loop: запись заберёт флашер при следующем запуске
+            return
+        self._start_flusher(loop)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
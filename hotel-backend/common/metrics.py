@@ -0,0 +1,394 @@
+"""Метрики HTTP-запросов и запросов к БД в текстовом формате Prometheus."""
+
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Iterable, Sequence
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Метка для запросов, не совпавших ни с одним маршрутом (чтобы не плодить серии)
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _escape(value: str) -> str:
+    """Экранирует значение метки."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    """Формирует блок меток {name="value",...}."""
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    """Форматирует значение метрики."""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric(ABC):
+    """Базовый класс метрики с набором меток."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Инициализация метрики.
+
+        Args:
+            name: Имя метрики
+            documentation: Описание метрики (HELP)
+            labelnames: Имена меток
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterable[str]:
+        """Возвращает строки значений метрики."""
+
+    def render(self) -> list[str]:
+        """Возвращает метрику в текстовом формате Prometheus."""
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+            *self.samples(),
+        ]
+
+
+class Counter(Metric):
+    """Монотонно растущий счётчик."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """Инициализация счётчика."""
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        """
+        Увеличивает счётчик.
+
+        Args:
+            labels: Значения меток в порядке labelnames
+            amount: Величина увеличения
+        """
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        """Возвращает строки значений счётчика."""
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Значение, которое может как расти, так и уменьшаться."""
+
+    type_name = "gauge"
+
+    def dec(self, labels: tuple = (), amount: float = 1) -> None:
+        """
+        Уменьшает значение.
+
+        Args:
+            labels: Значения меток в порядке labelnames
+            amount: Величина уменьшения
+        """
+        self.inc(labels, -amount)
+
+    def set(self, value: float, labels: tuple = ()) -> None:
+        """
+        Устанавливает значение.
+
+        Args:
+            value: Новое значение
+            labels: Значения меток в порядке labelnames
+        """
+        self._values[labels] = value
+
+
+class Histogram(Metric):
+    """Гистограмма с фиксированными границами корзин."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        """Инициализация гистограммы."""
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # Метки -> [счётчики корзин (без накопления) + переполнение, сумма]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, labels: tuple = ()) -> None:
+        """
+        Добавляет наблюдение.
+
+        Args:
+            value: Наблюдаемое значение
+            labels: Значения меток в порядке labelnames
+        """
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def samples(self) -> Iterable[str]:
+        """Возвращает строки корзин, суммы и количества наблюдений."""
+        for labels, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{le} {cumulative}"
+            plain = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{plain} {_format_value(total)}"
+            yield f"{self.name}_count{plain} {cumulative}"
+
+
+class MetricsRegistry:
+    """Набор метрик сервиса и функций, снимающих значения при каждом запросе /metrics."""
+
+    def __init__(self):
+        """Инициализация реестра."""
+        self._metrics: list[Metric] = []
+        self._collectors: list[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Регистрирует метрику.
+
+        Args:
+            metric: Метрика
+
+        Returns:
+            Metric: Та же метрика
+        """
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Metric]]) -> None:
+        """
+        Регистрирует функцию, возвращающую метрики на момент опроса.
+
+        Args:
+            collector: Функция без аргументов, возвращающая метрики
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Возвращает все метрики в текстовом формате Prometheus."""
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for metric in collector():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class RequestDbStats:
+    """Счётчики запросов к БД в рамках одного HTTP-запроса."""
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        """Инициализация счётчиков."""
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Статистика БД текущего HTTP-запроса (устанавливается middleware)
+_request_db_stats: ContextVar[RequestDbStats | None] = ContextVar("request_db_stats", default=None)
+
+
+class HttpMetrics:
+    """Метрики HTTP-запросов и запросов к БД."""
+
+    def __init__(self, registry: MetricsRegistry):
+        """
+        Создаёт и регистрирует метрики.
+
+        Args:
+            registry: Реестр метрик сервиса
+        """
+        self.requests = registry.register(Counter(
+            "http_requests_total", "HTTP requests", ("method", "route", "status"),
+        ))
+        self.latency = registry.register(Histogram(
+            "http_request_duration_seconds", "HTTP request latency", ("method", "route"),
+        ))
+        self.in_flight = registry.register(Gauge(
+            "http_requests_in_flight", "HTTP requests being processed",
+        ))
+        self.response_size = registry.register(Histogram(
+            "http_response_size_bytes", "HTTP response body size", ("method", "route"), SIZE_BUCKETS,
+        ))
+        self.db_queries = registry.register(Histogram(
+            "http_request_db_queries", "DB queries per HTTP request", ("method", "route"),
+            QUERY_COUNT_BUCKETS,
+        ))
+        self.db_time = registry.register(Histogram(
+            "http_request_db_duration_seconds", "DB time per HTTP request", ("method", "route"),
+        ))
+        self.db_queries_total = registry.register(Counter(
+            "db_queries_total", "DB queries executed",
+        ))
+        self.db_query_seconds = registry.register(Histogram(
+            "db_query_duration_seconds", "DB query latency",
+        ))
+        self.in_flight.set(0)
+
+
+class MetricsMiddleware:
+    """ASGI middleware, собирающее метрики HTTP-запросов по шаблонам маршрутов."""
+
+    def __init__(self, app, metrics: HttpMetrics):
+        """
+        Инициализация middleware.
+
+        Args:
+            app: Следующее ASGI приложение
+            metrics: Метрики HTTP-запросов
+        """
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        """Обрабатывает ASGI вызов."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        status_code = 500
+        body_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, body_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_size += len(message.get("body", b""))
+            await send(message)
+
+        db_stats = RequestDbStats()
+        token = _request_db_stats.set(db_stats)
+        metrics.in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.in_flight.dec()
+            _request_db_stats.reset(token)
+
+            # Шаблон пути (/hotels/{hotel_id}) вместо фактического пути
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", UNMATCHED_ROUTE))
+            metrics.requests.inc((*labels, str(status_code)))
+            metrics.latency.observe(elapsed, labels)
+            metrics.response_size.observe(body_size, labels)
+            metrics.db_queries.observe(db_stats.queries, labels)
+            metrics.db_time.observe(db_stats.seconds, labels)
+
+
+def instrument_engine(engine: AsyncEngine, metrics: HttpMetrics) -> None:
+    """
+    Подписывается на события engine для подсчёта запросов к БД.
+
+    Args:
+        engine: Асинхронный engine
+        metrics: Метрики, в которые пишутся запросы
+    """
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        metrics.db_queries_total.inc()
+        metrics.db_query_seconds.observe(elapsed)
+        db_stats = _request_db_stats.get()
+        if db_stats is not None:
+            db_stats.queries += 1
+            db_stats.seconds += elapsed
+
+    @event.listens_for(engine.sync_engine, "handle_error")
+    def handle_error(exception_context):
+        # Запрос завершился ошибкой — after_cursor_execute не будет вызван
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+
+def gauges(prefix: str, documentation: str, values: dict[str, float]) -> list[Metric]:
+    """
+    Преобразует словарь статистики в набор gauge-метрик.
+
+    Args:
+        prefix: Префикс имён метрик
+        documentation: Описание метрик
+        values: Имя показателя -> значение (нечисловые значения пропускаются)
+
+    Returns:
+        list[Metric]: Метрики вида <prefix>_<name>
+    """
+    metrics = []
+    for key, value in values.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        gauge = Gauge(f"{prefix}_{key}", f"{documentation}: {key}")
+        gauge.set(value)
+        metrics.append(gauge)
+    return metrics
+
+
+def setup_metrics(app: FastAPI, engine: AsyncEngine | None = None) -> MetricsRegistry:
+    """
+    Подключает сбор метрик к приложению и добавляет эндпоинт /metrics.
+
+    Args:
+        app: FastAPI приложение
+        engine: Engine базы данных для подсчёта запросов к БД
+
+    Returns:
+        MetricsRegistry: Реестр, в который можно добавить свои метрики и коллекторы
+    """
+    registry = MetricsRegistry()
+    metrics = HttpMetrics(registry)
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+    if engine is not None:
+        instrument_engine(engine, metrics)
+
+    @app.get("/metrics", tags=["Health"], include_in_schema=False)
+    async def metrics_endpoint():
+        """Метрики сервиса в текстовом формате Prometheus."""
+        return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
+
+    return registry
@@ -6,6 +6,7 @@ from common.models.hotel import Hotel
 from common.models.room import Room
 from common.models.booking import Booking
 from common.models.log import LogEntry
+from common.models.log_rollup import LogRollup
 
 __all__ = [
     "Base",
@@ -14,5 +15,6 @@ __all__ = [
     "Room",
     "Booking",
     "LogEntry",
+    "LogRollup",
 ]
 
@@ -3,7 +3,8 @@
 from datetime import date, datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import Date, DateTime, ForeignKey, func
+from sqlalchemy import Date, DateTime, ForeignKey, Index, func, literal_column
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from common.models.base import Base
@@ -13,6 +14,29 @@ class Booking(Base):
     """Модель бронирования."""
 
     __tablename__ = "bookings"
+    __table_args__ = (
+        Index(
+            "ix_bookings_room_dates",
+            "room_id",
+            "check_in_date",
+            "check_out_date",
+        ),
+        # Ключ keyset-пагинации бронирований пользователя
+        Index("ix_bookings_user_created_id", "user_id", "created_at", "id"),
+        # Запрет пересекающихся бронирований одной комнаты (требует btree_gist)
+        ExcludeConstraint(
+            ("room_id", "="),
+            (
+                func.daterange(
+                    literal_column("check_in_date"),
+                    literal_column("check_out_date"),
+                ),
+                "&&",
+            ),
+            name="ex_bookings_room_overlap",
+            using="gist",
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(
         primary_key=True,
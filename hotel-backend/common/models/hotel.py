@@ -3,7 +3,7 @@
 from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import DateTime, String, Text, func
+from sqlalchemy import DateTime, Index, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from common.models.base import Base
@@ -13,6 +13,10 @@ class Hotel(Base):
     """Модель отеля."""
 
     __tablename__ = "hotels"
+    __table_args__ = (
+        # Ключ keyset-пагинации списка отелей
+        Index("ix_hotels_created_at_id", "created_at", "id"),
+    )
 
     id: Mapped[UUID] = mapped_column(
         primary_key=True,
@@ -29,11 +33,13 @@ class Hotel(Base):
         nullable=False,
     )
 
-    # Связь с комнатами
+    # Связь с комнатами: не загружается неявно, нужные эндпоинты
+    # подключают selectinload явно. Удаление каскадирует сама БД.
     rooms: Mapped[list["Room"]] = relationship(
         "Room",
         back_populates="hotel",
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="raise",
+        passive_deletes=True,
     )
 
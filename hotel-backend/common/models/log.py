@@ -3,7 +3,7 @@
 from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import DateTime, Integer, String, func
+from sqlalchemy import DateTime, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from common.models.base import Base
@@ -13,6 +13,20 @@ class LogEntry(Base):
     """Модель записи лога."""
 
     __tablename__ = "logs"
+    __table_args__ = (
+        # Ключи keyset-пагинации: общий и с фильтром по сервису
+        Index("ix_logs_created_at_id", "created_at", "id"),
+        Index("ix_logs_service_created_at_id", "service_name", "created_at", "id"),
+        # Триграммный индекс для поиска подстроки в сообщении (ILIKE, требует pg_trgm)
+        Index(
+            "ix_logs_message_trgm",
+            "message",
+            postgresql_using="gin",
+            postgresql_ops={"message": "gin_trgm_ops"},
+        ),
+        # Таблица секционирована по дням: ключ секционирования входит в первичный ключ
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[UUID] = mapped_column(
         primary_key=True,
@@ -24,6 +38,7 @@ class LogEntry(Base):
     service_name: Mapped[str] = mapped_column(String(255), nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        primary_key=True,
         server_default=func.now(),
         nullable=False,
     )
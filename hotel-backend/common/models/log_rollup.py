@@ -0,0 +1,20 @@
+"""Модель поминутных счётчиков логов."""
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from common.models.base import Base
+
+
+class LogRollup(Base):
+    """Количество логов за минуту по сервису и уровню."""
+
+    __tablename__ = "log_rollups"
+
+    # Первичный ключ начинается с bucket: выборка за интервал идёт по индексу
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    service_name: Mapped[str] = mapped_column(String(255), primary_key=True)
+    level: Mapped[int] = mapped_column(Integer, primary_key=True)
+    count: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -1,9 +1,10 @@
 """Модель комнаты."""
 
+from datetime import datetime
 from decimal import Decimal
 from uuid import UUID, uuid4
 
-from sqlalchemy import ForeignKey, Numeric, String
+from sqlalchemy import DateTime, ForeignKey, Index, Numeric, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from common.models.base import Base
@@ -13,6 +14,10 @@ class Room(Base):
     """Модель комнаты."""
 
     __tablename__ = "rooms"
+    __table_args__ = (
+        # Ключ keyset-пагинации комнат отеля (покрывает и фильтр по hotel_id)
+        Index("ix_rooms_hotel_number_id", "hotel_id", "room_number", "id"),
+    )
 
     id: Mapped[UUID] = mapped_column(
         primary_key=True,
@@ -30,6 +35,13 @@ class Room(Base):
         nullable=False,
     )
     img_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    # Время последнего изменения: по нему строится ETag списка бронирований
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
 
     # Связь с отелем
     hotel: Mapped["Hotel"] = relationship(
@@ -42,5 +54,6 @@ class Room(Base):
         "Booking",
         back_populates="room",
         cascade="all, delete-orphan",
+        passive_deletes=True,
     )
 
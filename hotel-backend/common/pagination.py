@@ -0,0 +1,110 @@
+"""Курсорная (keyset) пагинация для списковых эндпоинтов."""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, Sequence
+
+from sqlalchemy import Select, tuple_
+
+# Заголовок, в котором списковые эндпоинты возвращают курсор следующей страницы
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    """Курсор пагинации не удалось разобрать."""
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Кодирует значения ключа сортировки в непрозрачный токен.
+
+    Args:
+        values: Значения колонок ключа последней записи страницы
+
+    Returns:
+        str: Курсор в формате base64url
+    """
+    raw = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else str(value) for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, *types: type) -> tuple:
+    """
+    Декодирует курсор в значения ключа сортировки.
+
+    Args:
+        token: Курсор, полученный от encode_cursor
+        types: Типы значений ключа (datetime, UUID, str, ...)
+
+    Returns:
+        tuple: Значения ключа в порядке колонок
+
+    Raises:
+        InvalidCursorError: Если курсор повреждён или не соответствует ключу
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(types):
+            raise ValueError("cursor shape mismatch")
+        return tuple(
+            datetime.fromisoformat(value) if value_type is datetime else value_type(value)
+            for value_type, value in zip(types, raw)
+        )
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def apply_keyset(
+    query: Select,
+    columns: Sequence[Any],
+    after: tuple | None,
+    limit: int,
+    descending: bool = False,
+) -> Select:
+    """
+    Добавляет к запросу условие keyset-пагинации, сортировку и лимит.
+
+    Запрашивается limit + 1 строка, чтобы понять, есть ли следующая страница.
+
+    Args:
+        query: Исходный запрос
+        columns: Колонки ключа сортировки (последняя должна быть уникальной)
+        after: Значения ключа последней записи предыдущей страницы
+        limit: Размер страницы
+        descending: Сортировка по убыванию
+
+    Returns:
+        Select: Запрос страницы
+    """
+    if after is not None:
+        key = tuple_(*columns)
+        query = query.where(key < after if descending else key > after)
+    order_by = [column.desc() if descending else column.asc() for column in columns]
+    return query.order_by(*order_by).limit(limit + 1)
+
+
+def split_page(
+    rows: Sequence[Any],
+    limit: int,
+    key: Callable[[Any], tuple],
+) -> tuple[list[Any], str | None]:
+    """
+    Обрезает результат apply_keyset до страницы и строит курсор следующей.
+
+    Args:
+        rows: Строки, полученные запросом из apply_keyset
+        limit: Размер страницы
+        key: Функция, возвращающая значения ключа сортировки строки
+
+    Returns:
+        tuple[list[Any], str | None]: Строки страницы и курсор следующей страницы
+    """
+    page = list(rows[:limit])
+    next_cursor = encode_cursor(*key(page[-1])) if len(rows) > limit else None
+    return page, next_cursor
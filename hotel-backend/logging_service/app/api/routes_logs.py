@@ -1,68 +1,584 @@
 """API роуты для работы с логами."""
 
-from typing import Optional
+import asyncio
+import html
+import json
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Optional
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, func as sql_func
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import BigInteger, ColumnElement, cast, literal, select, text, tuple_, func as sql_func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
-from app.db.session import get_db
-from common.models import LogEntry
-from app.schemas.log import LogEntryListResponse, LogEntryResponse
+from app.core.config import settings
+from app.db.rollups import BUCKET_ORIGIN, bucket_start
+from app.db.session import AsyncSessionLocal, get_db
+from app.worker.broadcast import LogSubscription, broadcaster, relay
+from common.cache import TTLCache
+from common.export import ExportFormat, export_response
+from common.models import LogEntry, LogRollup
+from common.pagination import apply_keyset, decode_cursor, split_page
+from app.schemas.log import (
+    LogEntryListResponse,
+    LogEntryResponse,
+    LogStatsBucket,
+    LogStatsResponse,
+)
 
 router = APIRouter(prefix="/logs", tags=["Logs"])
 
+# Кэш общего количества записей по набору фильтров
+total_cache: TTLCache[tuple, int] = TTLCache(
+    maxsize=settings.LOGS_TOTAL_CACHE_SIZE,
+    ttl=settings.LOGS_TOTAL_CACHE_TTL_SECONDS,
+)
+
+# Символов контекста вокруг первого совпадения в snippet
+SNIPPET_CONTEXT_CHARS = 60
+
+# Размеры интервалов GET /logs/stats
+STATS_BUCKETS = {
+    "1m": timedelta(minutes=1),
+    "5m": timedelta(minutes=5),
+    "15m": timedelta(minutes=15),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+
+# Интервалов в GET /logs/stats, если не указан from
+STATS_DEFAULT_BUCKETS = 60
+
+# Уровень ERROR для error_rate
+ERROR_LEVEL = 3
+
+# Оценка числа строк по статистике таблицы logs и всех её партиций.
+# У секционированной таблицы после ANALYZE reltuples равен сумме секций,
+# поэтому учитываются только таблицы с данными (relkind <> 'p')
+ESTIMATE_TABLE_ROWS_SQL = text(
+    """
+    SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint
+    FROM pg_class c
+    WHERE c.relkind <> 'p'
+      AND (c.oid = 'logs'::regclass
+           OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = 'logs'::regclass))
+    """
+)
+
+
+async def estimate_total(db: AsyncSession, conditions: list[ColumnElement[bool]]) -> int:
+    """
+    Оценивает количество записей по статистике планировщика.
+
+    Без фильтров используется reltuples из pg_class, с фильтрами — оценка
+    строк из EXPLAIN. Сам запрос при этом не выполняется.
+
+    Args:
+        db: Сессия базы данных
+        conditions: Условия фильтрации
+
+    Returns:
+        int: Оценка количества записей
+    """
+    if not conditions:
+        result = await db.execute(ESTIMATE_TABLE_ROWS_SQL)
+        return int(result.scalar_one())
+
+    # Значения фильтров, включая свободный текст q, передаются драйверу
+    # связанными параметрами ($1, $2, ...) в порядке их появления в запросе
+    query = select(LogEntry.id).where(*conditions)
+    compiled = query.compile(dialect=db.get_bind().dialect)
+    params = compiled.params
+    connection = await db.connection()
+    result = await connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}",
+        tuple(params[name] for name in compiled.positiontup),
+    )
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_total(
+    db: AsyncSession,
+    mode: str,
+    conditions: list[ColumnElement[bool]],
+    cache_key: tuple,
+) -> int | None:
+    """
+    Возвращает общее количество записей в выбранном режиме с кэшированием.
+
+    Args:
+        db: Сессия базы данных
+        mode: Режим подсчёта (exact, estimate или none)
+        conditions: Условия фильтрации
+        cache_key: Значения фильтров для ключа кэша
+
+    Returns:
+        int | None: Количество записей или None для режима none
+    """
+    if mode == "none":
+        return None
+
+    key = (mode, *cache_key)
+    total = total_cache.get(key)
+    if total is not None:
+        return total
+
+    if mode == "exact":
+        count_query = select(sql_func.count()).select_from(LogEntry).where(*conditions)
+        total = (await db.execute(count_query)).scalar_one()
+    else:
+        total = await estimate_total(db, conditions)
+
+    total_cache.set(key, total)
+    return total
+
+
+def like_pattern(q: str) -> str:
+    """Экранирует спецсимволы LIKE и оборачивает строку для поиска подстроки."""
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def highlight_snippet(message: str, q: str) -> str | None:
+    """
+    Вырезает фрагмент сообщения вокруг первого совпадения и выделяет совпадения.
+
+    Текст экранируется, поэтому результат можно вставлять как HTML.
+
+    Args:
+        message: Сообщение лога
+        q: Строка поиска
+
+    Returns:
+        str | None: Фрагмент с тегами <mark> или None, если совпадений нет
+    """
+    pattern = re.compile(re.escape(q), re.IGNORECASE)
+    first = pattern.search(message)
+    if first is None:
+        return None
+
+    start = max(0, first.start() - SNIPPET_CONTEXT_CHARS)
+    end = min(len(message), first.end() + SNIPPET_CONTEXT_CHARS)
+    fragment = message[start:end]
+
+    parts = []
+    position = 0
+    for match in pattern.finditer(fragment):
+        parts.append(html.escape(fragment[position:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(html.escape(fragment[position:]))
+
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if end < len(message) else ""
+    return prefix + "".join(parts) + suffix
+
+
+def log_conditions(
+    level: Optional[int],
+    service_name: Optional[str],
+    from_: Optional[datetime],
+    to: Optional[datetime],
+    q: Optional[str] = None,
+) -> list[ColumnElement[bool]]:
+    """
+    Строит условия фильтрации логов.
+
+    Args:
+        level: Фильтр по уровню лога
+        service_name: Фильтр по имени сервиса
+        from_: Начало интервала created_at (включительно)
+        to: Конец интервала created_at (не включительно)
+        q: Подстрока сообщения без учёта регистра
+
+    Returns:
+        list[ColumnElement[bool]]: Условия для WHERE
+
+    Raises:
+        HTTPException: Если from не раньше to
+    """
+    if from_ is not None and to is not None and from_ >= to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parameter 'from' must be earlier than 'to'",
+        )
+
+    conditions = []
+    if level is not None:
+        conditions.append(LogEntry.level == level)
+    if service_name is not None:
+        conditions.append(LogEntry.service_name == service_name)
+    # Интервал по created_at позволяет планировщику отсечь лишние секции
+    if from_ is not None:
+        conditions.append(LogEntry.created_at >= from_)
+    if to is not None:
+        conditions.append(LogEntry.created_at < to)
+    # ILIKE по подстроке использует триграммный индекс ix_logs_message_trgm
+    if q is not None:
+        conditions.append(LogEntry.message.ilike(like_pattern(q), escape="\\"))
+    return conditions
+
+
+async def search_logs(
+    db: AsyncSession,
+    conditions: list[ColumnElement[bool]],
+    q: str,
+    after: tuple | None,
+    limit: int,
+) -> list[LogEntry]:
+    """
+    Находит страницу логов, содержащих подстроку, новые первыми.
+
+    Оценка частоты ILIKE '%q%' берётся из выборки статистики и не учитывает
+    время: для подстроки, частой в выборке, но встречающейся только в старых
+    записях, планировщик выбирает обратный обход индекса created_at и
+    просматривает все более новые записи. Поэтому поиск идёт в два шага.
+    Сначала проверяются только последние (limit + 1) *
+    LOG_SEARCH_RECENT_ROWS_PER_RESULT записей: частые свежие подстроки
+    находятся здесь. Если страница не набрана, все совпадения выбираются по
+    триграммному индексу в MATERIALIZED CTE, которую планировщик не может
+    заменить обходом по created_at. Время ответа ограничено числом
+    совпадений, а не размером таблицы.
+
+    Args:
+        db: Сессия базы данных
+        conditions: Условия фильтрации без подстроки
+        q: Подстрока сообщения
+        after: Ключ последней записи предыдущей страницы
+        limit: Размер страницы
+
+    Returns:
+        list[LogEntry]: До limit + 1 записей для split_page
+    """
+    pattern = like_pattern(q)
+
+    # Последние записи по индексу created_at: объём просмотра ограничен
+    recent = apply_keyset(
+        select(LogEntry).where(*conditions),
+        [LogEntry.created_at, LogEntry.id],
+        after,
+        (limit + 1) * settings.LOG_SEARCH_RECENT_ROWS_PER_RESULT,
+        descending=True,
+    ).subquery("recent")
+    recent_entry = aliased(LogEntry, recent)
+    result = await db.execute(
+        select(recent_entry)
+        .where(recent_entry.message.ilike(pattern, escape="\\"))
+        .order_by(recent_entry.created_at.desc(), recent_entry.id.desc())
+        .limit(limit + 1)
+    )
+    logs = result.scalars().all()
+    if len(logs) > limit:
+        return logs
+
+    # Все совпадения по триграммному индексу, затем сортировка
+    matches = select(LogEntry).where(*conditions, LogEntry.message.ilike(pattern, escape="\\"))
+    if after is not None:
+        matches = matches.where(tuple_(LogEntry.created_at, LogEntry.id) < after)
+    matches = matches.cte("matches").prefix_with("MATERIALIZED")
+    entry = aliased(LogEntry, matches)
+    result = await db.execute(
+        apply_keyset(select(entry), [entry.created_at, entry.id], None, limit, descending=True)
+    )
+    return result.scalars().all()
+
 
 @router.get("", response_model=LogEntryListResponse)
 async def get_logs(
     level: Optional[int] = Query(None, ge=0, le=3, description="Фильтр по уровню лога"),
     service_name: Optional[str] = Query(None, description="Фильтр по имени сервиса"),
+    from_: Optional[datetime] = Query(None, alias="from", description="Начало интервала created_at (включительно)"),
+    to: Optional[datetime] = Query(None, description="Конец интервала created_at (не включительно)"),
+    q: Optional[str] = Query(
+        None,
+        min_length=3,
+        max_length=200,
+        description="Поиск подстроки в сообщении без учёта регистра (от 3 символов)",
+    ),
     limit: int = Query(100, ge=1, le=1000, description="Максимальное количество записей"),
+    cursor: Optional[str] = Query(None, description="Курсор следующей страницы"),
+    total_mode: Literal["exact", "estimate", "none"] = Query(
+        "exact",
+        description="Подсчёт total: точный, оценка по статистике или без подсчёта",
+    ),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Получить список логов с возможной фильтрацией.
+    Получить список логов с возможной фильтрацией и курсорной пагинацией.
     
     Args:
         level: Опциональный фильтр по уровню лога (0-3)
         service_name: Опциональный фильтр по имени сервиса
+        from_: Начало интервала по времени создания (параметр from)
+        to: Конец интервала по времени создания
+        q: Подстрока сообщения; найденные записи получают snippet с подсветкой
         limit: Максимальное количество записей (по умолчанию 100)
+        cursor: Курсор, полученный с предыдущей страницей
+        total_mode: Режим подсчёта total (результат кэшируется на короткий TTL)
         db: Сессия базы данных
         
     Returns:
-        LogEntryListResponse: Список логов и общее количество
+        LogEntryListResponse: Список логов, общее количество и курсор следующей страницы
+        
+    Raises:
+        HTTPException: Если from не раньше to
     """
-    # Строим базовый запрос
-    query = select(LogEntry)
-    count_query = select(sql_func.count()).select_from(LogEntry)
-    
     # Применяем фильтры
-    conditions = []
-    if level is not None:
-        conditions.append(LogEntry.level == level)
-    if service_name is not None:
-        conditions.append(LogEntry.service_name == service_name)
+    conditions = log_conditions(level, service_name, from_, to, q)
+    after = decode_cursor(cursor, datetime, UUID) if cursor else None
     
-    if conditions:
-        for condition in conditions:
-            query = query.where(condition)
-            count_query = count_query.where(condition)
+    if q is None:
+        # Сортировка по дате создания (новые первыми), keyset-пагинация и лимит
+        query = apply_keyset(
+            select(LogEntry).where(*conditions),
+            [LogEntry.created_at, LogEntry.id],
+            after,
+            limit,
+            descending=True,
+        )
+        rows = (await db.execute(query)).scalars().all()
+    else:
+        rows = await search_logs(db, log_conditions(level, service_name, from_, to), q, after, limit)
     
-    # Сортировка по дате создания (новые первыми)
-    query = query.order_by(LogEntry.created_at.desc())
+    logs, next_cursor = split_page(rows, limit, lambda log: (log.created_at, log.id))
     
-    # Применяем лимит
-    query = query.limit(limit)
+    total = await count_total(db, total_mode, conditions, (level, service_name, from_, to, q))
     
-    # Выполняем запросы
-    result = await db.execute(query)
-    logs = result.scalars().all()
-    
-    count_result = await db.execute(count_query)
-    total = count_result.scalar_one()
+    entries = [LogEntryResponse.model_validate(log) for log in logs]
+    if q is not None:
+        for entry in entries:
+            entry.snippet = highlight_snippet(entry.message, q)
     
     return LogEntryListResponse(
-        logs=[LogEntryResponse.model_validate(log) for log in logs],
+        logs=entries,
         total=total,
+        next_cursor=next_cursor,
     )
 
+
+@router.get("/stats", response_model=LogStatsResponse)
+async def get_log_stats(
+    from_: Optional[datetime] = Query(None, alias="from", description="Начало периода (включительно)"),
+    to: Optional[datetime] = Query(None, description="Конец периода (не включительно), по умолчанию сейчас"),
+    bucket: Literal["1m", "5m", "15m", "1h", "1d"] = Query("1m", description="Размер интервала"),
+    service_name: Optional[str] = Query(None, description="Фильтр по имени сервиса"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Получить количество логов по интервалам времени, сервисам и уровням.
+
+    Статистика читается из поминутных счётчиков log_rollups, которые consumer
+    накапливает в памяти и сбрасывает каждые LOG_ROLLUP_FLUSH_INTERVAL_SECONDS,
+    поэтому время ответа зависит от длины периода, а не от объёма таблицы logs.
+    Последние секунды ещё не учтены. Точность — одна минута; начало периода
+    округляется вниз до границы интервала.
+
+    Args:
+        from_: Начало периода (параметр from), по умолчанию 60 интервалов до to
+        to: Конец периода
+        bucket: Размер интервала: 1m, 5m, 15m, 1h или 1d
+        service_name: Опциональный фильтр по имени сервиса
+        db: Сессия базы данных
+
+    Returns:
+        LogStatsResponse: Интервалы с количеством логов по сервисам и уровням
+
+    Raises:
+        HTTPException: Если from не раньше to или интервалов больше LOG_STATS_MAX_BUCKETS
+    """
+    size = STATS_BUCKETS[bucket]
+    # Время без часового пояса считается UTC, как в поминутных счётчиках
+    if to is None:
+        to = datetime.now(timezone.utc)
+    elif to.tzinfo is None:
+        to = to.replace(tzinfo=timezone.utc)
+    if from_ is not None and from_.tzinfo is None:
+        from_ = from_.replace(tzinfo=timezone.utc)
+    if from_ is None:
+        from_ = to - size * STATS_DEFAULT_BUCKETS
+    if from_ >= to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Parameter 'from' must be earlier than 'to'",
+        )
+
+    start = bucket_start(from_, size)
+    if -(-(to - start) // size) > settings.LOG_STATS_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many buckets: at most {settings.LOG_STATS_MAX_BUCKETS} allowed",
+        )
+
+    bucket_column = sql_func.date_bin(literal(size), LogRollup.bucket, literal(BUCKET_ORIGIN))
+    query = (
+        select(
+            bucket_column.label("bucket"),
+            LogRollup.service_name,
+            LogRollup.level,
+            cast(sql_func.sum(LogRollup.count), BigInteger).label("count"),
+        )
+        .where(LogRollup.bucket >= start, LogRollup.bucket < to)
+        .group_by(bucket_column, LogRollup.service_name, LogRollup.level)
+        .order_by(bucket_column, LogRollup.service_name, LogRollup.level)
+    )
+    if service_name is not None:
+        query = query.where(LogRollup.service_name == service_name)
+
+    stats: dict[tuple[datetime, str], LogStatsBucket] = {}
+    for row in await db.execute(query):
+        item = stats.get((row.bucket, row.service_name))
+        if item is None:
+            item = stats[(row.bucket, row.service_name)] = LogStatsBucket(
+                bucket=row.bucket,
+                service_name=row.service_name,
+                total=0,
+                by_level={},
+                error_rate=0.0,
+            )
+        item.by_level[row.level] = row.count
+        item.total += row.count
+    for item in stats.values():
+        item.error_rate = item.by_level.get(ERROR_LEVEL, 0) / item.total
+
+    return LogStatsResponse(bucket=bucket, stats=list(stats.values()))
+
+
+async def stream_events(subscription: LogSubscription):
+    """
+    Отдаёт события подписки до отключения клиента.
+
+    При отсутствии логов отправляется keepalive-комментарий, чтобы прокси не
+    закрывали соединение. Если подписка отключена из-за переполнения очереди,
+    клиент получает событие dropped и поток завершается.
+
+    Args:
+        subscription: Подписка на поток логов
+
+    Yields:
+        str: SSE-события
+    """
+    try:
+        yield "retry: 3000\n\n"
+        while not subscription.dropped:
+            try:
+                yield await asyncio.wait_for(
+                    subscription.queue.get(),
+                    timeout=settings.LOG_STREAM_KEEPALIVE_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+        yield 'event: dropped\ndata: {"reason": "client is too slow"}\n\n'
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+@router.get("/stream")
+async def stream_logs(
+    level: Optional[int] = Query(None, ge=0, le=3, description="Фильтр по уровню лога"),
+    service_name: Optional[str] = Query(None, description="Фильтр по имени сервиса"),
+):
+    """
+    Получать новые логи в реальном времени (Server-Sent Events).
+
+    Логи отправляются сразу после записи в БД, без запросов к Postgres.
+    Каждый процесс, записывающий логи (consumer API или воркер
+    app.worker.main), публикует записанные пачки в fanout exchange
+    RABBITMQ_LOG_STREAM_EXCHANGE, а каждый процесс API читает его своей
+    очередью. Поэтому поток работает и при LOG_CONSUMER_IN_API=false, а
+    подписчик любой реплики получает логи всех consumer'ов, а не только своего
+    процесса. Каждый лог — событие log с JSON записи в data.
+
+    Доставка не гарантируется: логи, записанные, пока процесс API не подключён
+    к RabbitMQ, или вытесненные из переполненной очереди процесса, в поток не
+    попадают. Клиент, не успевающий читать поток, отключается событием dropped
+    и может переподключиться; пропущенные логи доступны через GET /logs.
+    
+    Args:
+        level: Опциональный фильтр по уровню лога (0-3)
+        service_name: Опциональный фильтр по имени сервиса
+        
+    Returns:
+        StreamingResponse: Поток text/event-stream
+        
+    Raises:
+        HTTPException: Если процесс не подписан на exchange потока или достигнут
+            лимит подписчиков LOG_STREAM_MAX_SUBSCRIBERS
+    """
+    if not relay.is_running:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Log stream is not connected to RabbitMQ",
+        )
+    subscription = broadcaster.subscribe(level, service_name)
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many log stream subscribers",
+        )
+    return StreamingResponse(
+        stream_events(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/export")
+async def export_logs(
+    level: Optional[int] = Query(None, ge=0, le=3, description="Фильтр по уровню лога"),
+    service_name: Optional[str] = Query(None, description="Фильтр по имени сервиса"),
+    from_: Optional[datetime] = Query(None, alias="from", description="Начало интервала created_at (включительно)"),
+    to: Optional[datetime] = Query(None, description="Конец интервала created_at (не включительно)"),
+    q: Optional[str] = Query(
+        None,
+        min_length=3,
+        max_length=200,
+        description="Поиск подстроки в сообщении без учёта регистра (от 3 символов)",
+    ),
+    export_format: ExportFormat = Query("ndjson", alias="format", description="Формат выгрузки"),
+):
+    """
+    Выгрузить все логи, подходящие под фильтры, потоком NDJSON или CSV.
+
+    Строки читаются серверным курсором пачками по EXPORT_BATCH_SIZE и сразу
+    отправляются клиенту, поэтому память не зависит от размера выгрузки.
+    На время выгрузки занимается одно соединение из пула.
+    
+    Args:
+        level: Опциональный фильтр по уровню лога (0-3)
+        service_name: Опциональный фильтр по имени сервиса
+        from_: Начало интервала по времени создания (параметр from)
+        to: Конец интервала по времени создания
+        q: Подстрока сообщения
+        export_format: Формат выгрузки: ndjson или csv (параметр format)
+        
+    Returns:
+        StreamingResponse: Логи в порядке created_at
+        
+    Raises:
+        HTTPException: Если from не раньше to
+    """
+    conditions = log_conditions(level, service_name, from_, to, q)
+    query = (
+        select(
+            LogEntry.id,
+            LogEntry.created_at,
+            LogEntry.level,
+            LogEntry.service_name,
+            LogEntry.message,
+        )
+        .where(*conditions)
+        .order_by(LogEntry.created_at, LogEntry.id)
+    )
+    return export_response(
+        AsyncSessionLocal,
+        query,
+        export_format,
+        "logs",
+        settings.EXPORT_BATCH_SIZE,
+    )
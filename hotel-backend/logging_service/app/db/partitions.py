@@ -0,0 +1,207 @@
+"""Обслуживание дневных секций таблицы logs."""
+
+import asyncio
+import logging
+import re
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "logs"
+DEFAULT_PARTITION = "logs_default"
+
+# Имена дневных секций: logs_pYYYYMMDD
+PARTITION_NAME_RE = re.compile(r"^logs_p(\d{8})$")
+
+IS_PARTITIONED_SQL = text(
+    """
+    SELECT EXISTS (
+        SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('logs')
+    )
+    """
+)
+
+LIST_PARTITIONS_SQL = text(
+    """
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'logs'::regclass
+    """
+)
+
+
+def partition_name(day: date) -> str:
+    """
+    Возвращает имя секции для дня.
+
+    Args:
+        day: День, записи которого хранит секция
+
+    Returns:
+        str: Имя таблицы секции
+    """
+    return f"{PARENT_TABLE}_p{day:%Y%m%d}"
+
+
+def day_start(day: date) -> datetime:
+    """
+    Возвращает начало дня в UTC — границу дневной секции.
+
+    Args:
+        day: День
+
+    Returns:
+        datetime: Полночь дня в UTC
+    """
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+async def is_partitioned(engine: AsyncEngine) -> bool:
+    """
+    Проверяет, что таблица logs создана как секционированная.
+
+    Args:
+        engine: Engine базы данных логов
+
+    Returns:
+        bool: True, если logs секционирована
+    """
+    async with engine.connect() as conn:
+        return bool((await conn.execute(IS_PARTITIONED_SQL)).scalar())
+
+
+async def create_partitions(engine: AsyncEngine, start: date, days: int) -> list[str]:
+    """
+    Создаёт секцию по умолчанию и недостающие дневные секции.
+
+    Каждая секция создаётся в отдельной транзакции: если в секции по умолчанию
+    уже лежат строки за этот день, создание секции не удастся, но остальные
+    будут созданы.
+
+    Args:
+        engine: Engine базы данных логов
+        start: Первый день
+        days: Количество дней начиная со start
+
+    Returns:
+        list[str]: Имена созданных секций
+    """
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT")
+        )
+        existing = set((await conn.execute(LIST_PARTITIONS_SQL)).scalars().all())
+
+    created = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        name = partition_name(day)
+        if name in existing:
+            continue
+        lower = day_start(day).isoformat()
+        upper = day_start(day + timedelta(days=1)).isoformat()
+        try:
+            async with engine.begin() as conn:
+                await conn.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+                        f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+                    )
+                )
+            created.append(name)
+        except Exception as e:
+            logger.warning(f"Failed to create log partition {name}: {e}")
+    return created
+
+
+async def drop_expired_partitions(engine: AsyncEngine, retention_days: int, today: date) -> list[str]:
+    """
+    Удаляет дневные секции старше срока хранения.
+
+    Секции удаляются целиком через DROP TABLE. Из секции по умолчанию
+    устаревшие строки удаляются DELETE — туда попадают только записи вне
+    диапазона созданных секций.
+
+    Args:
+        engine: Engine базы данных логов
+        retention_days: Срок хранения в днях
+        today: Текущий день
+
+    Returns:
+        list[str]: Имена удалённых секций
+    """
+    cutoff = today - timedelta(days=retention_days)
+    async with engine.connect() as conn:
+        names = (await conn.execute(LIST_PARTITIONS_SQL)).scalars().all()
+
+    dropped = []
+    for name in sorted(names):
+        match = PARTITION_NAME_RE.match(name)
+        if not match:
+            continue
+        day = datetime.strptime(match.group(1), "%Y%m%d").date()
+        # Секция удаляется, когда все её записи старше границы хранения
+        if day >= cutoff:
+            continue
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        dropped.append(name)
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < :cutoff"),
+            {"cutoff": day_start(cutoff)},
+        )
+    return dropped
+
+
+async def maintain_partitions(engine: AsyncEngine, premake_days: int, retention_days: int) -> None:
+    """
+    Создаёт секции на ближайшие дни и удаляет устаревшие.
+
+    Args:
+        engine: Engine базы данных логов
+        premake_days: На сколько дней вперёд создавать секции
+        retention_days: Срок хранения в днях (0 — без удаления)
+    """
+    if not await is_partitioned(engine):
+        logger.warning("Table logs is not partitioned, skipping partition maintenance")
+        return
+
+    today = datetime.now(timezone.utc).date()
+    # Вчерашняя секция нужна для записей с небольшим отставанием часов
+    created = await create_partitions(engine, today - timedelta(days=1), premake_days + 2)
+    if created:
+        logger.info(f"Created log partitions: {', '.join(created)}")
+
+    if retention_days > 0:
+        dropped = await drop_expired_partitions(engine, retention_days, today)
+        if dropped:
+            logger.info(f"Dropped expired log partitions: {', '.join(dropped)}")
+
+
+async def run_partition_maintenance(
+    engine: AsyncEngine,
+    premake_days: int,
+    retention_days: int,
+    interval: float,
+) -> None:
+    """
+    Периодически обслуживает секции таблицы logs.
+
+    Args:
+        engine: Engine базы данных логов
+        premake_days: На сколько дней вперёд создавать секции
+        retention_days: Срок хранения в днях (0 — без удаления)
+        interval: Интервал между запусками в секундах
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await maintain_partitions(engine, premake_days, retention_days)
+        except Exception as e:
+            logger.error(f"Log partition maintenance failed: {e}")
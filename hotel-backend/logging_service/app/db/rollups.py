@@ -0,0 +1,122 @@
+"""Поминутные счётчики логов (log_rollups) по сервису и уровню."""
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable
+
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db.session import AsyncSessionLocal
+from common.models import LogRollup
+
+logger = logging.getLogger(__name__)
+
+# Точка отсчёта интервалов GET /logs/stats: границы кратны размеру интервала от неё
+BUCKET_ORIGIN = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+def minute_start(moment: datetime) -> datetime:
+    """
+    Возвращает начало минуты в UTC.
+
+    Args:
+        moment: Момент времени (без часового пояса считается UTC)
+
+    Returns:
+        datetime: Начало минуты, которой принадлежит момент
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).replace(second=0, microsecond=0)
+
+
+def bucket_start(moment: datetime, bucket: timedelta) -> datetime:
+    """
+    Возвращает начало интервала размера bucket, как date_bin в PostgreSQL.
+
+    Args:
+        moment: Момент времени
+        bucket: Размер интервала
+
+    Returns:
+        datetime: Начало интервала, отсчитанного от BUCKET_ORIGIN
+    """
+    return BUCKET_ORIGIN + (minute_start(moment) - BUCKET_ORIGIN) // bucket * bucket
+
+
+class RollupCounter:
+    """
+    Поминутные счётчики процесса, периодически прибавляемые к log_rollups.
+
+    Записанные логи учитываются в памяти, а в БД счётчики попадают одним
+    upsert раз в flush_interval. Пачки логов не блокируют общие строки
+    log_rollups, а каждый процесс обновляет строку текущей минуты не чаще
+    одного раза за интервал. Счётчики, не сброшенные до аварийного завершения
+    процесса, теряются, поэтому статистика может быть занижена на
+    flush_interval и отстаёт от logs на столько же.
+    """
+
+    def __init__(self, flush_interval: float):
+        """
+        Инициализация счётчиков.
+
+        Args:
+            flush_interval: Интервал сброса счётчиков в БД в секундах
+        """
+        self.flush_interval = flush_interval
+        self._counts: Counter[tuple[datetime, str, int]] = Counter()
+
+    @property
+    def pending(self) -> int:
+        """Число счётчиков, ещё не сброшенных в БД."""
+        return len(self._counts)
+
+    def add(self, rows: Iterable[dict[str, Any]]):
+        """
+        Учитывает записанные логи.
+
+        Args:
+            rows: Значения колонок записанных логов
+        """
+        self._counts.update(
+            (minute_start(row["created_at"]), row["service_name"], row["level"]) for row in rows
+        )
+
+    async def flush(self):
+        """
+        Прибавляет накопленные счётчики к log_rollups.
+
+        Счётчики отсортированы по ключу: процессы блокируют строки log_rollups
+        в одном порядке и не попадают во взаимную блокировку. При ошибке
+        счётчики возвращаются в память и будут сброшены в следующий раз.
+        """
+        if not self._counts:
+            return
+        counts, self._counts = self._counts, Counter()
+        values = [
+            {"bucket": bucket, "service_name": service_name, "level": level, "count": count}
+            for (bucket, service_name, level), count in sorted(counts.items())
+        ]
+        statement = insert(LogRollup).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[LogRollup.bucket, LogRollup.service_name, LogRollup.level],
+            set_={"count": LogRollup.count + statement.excluded.count},
+        )
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(statement)
+                await session.commit()
+        except Exception:
+            self._counts.update(counts)
+            raise
+
+    async def run(self):
+        """Сбрасывает счётчики каждые flush_interval секунд до отмены задачи."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush log rollups: {e}")
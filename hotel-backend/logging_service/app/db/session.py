@@ -1,19 +1,12 @@
 """Асинхронный engine и фабрика сессий для SQLAlchemy."""
 
-from sqlalchemy.ext.asyncio import (
-    AsyncSession,
-    async_sessionmaker,
-    create_async_engine,
-)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.core.config import settings
+from common.db import create_db_engine
 
-# Создание асинхронного engine
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-)
+# Создание асинхронного engine с параметрами пула из настроек
+engine = create_db_engine(settings.DATABASE_URL, settings)
 
 # Фабрика сессий
 AsyncSessionLocal = async_sessionmaker(
@@ -1,15 +1,23 @@
 """FastAPI приложение для logging-service."""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.api.routes_logs import router as logs_router
+from app.api.routes_logs import router as logs_router, total_cache
 from app.core.config import settings
+from app.db.partitions import maintain_partitions, run_partition_maintenance
 from app.db.session import engine
+from app.worker.broadcast import broadcaster, relay
 from app.worker.consumer import consumer
+from common.db import pool_stats
+from common.health import CheckFailed, ReadinessProbe, database_check, setup_health
+from common.metrics import gauges, setup_metrics
+from common.pagination import InvalidCursorError
 
 # Настройка логирования
 logging.basicConfig(
@@ -31,20 +39,50 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Logging Service...")
     logger.info(f"Database URL: {settings.DATABASE_URL.split('@')[1] if '@' in settings.DATABASE_URL else 'configured'}")
     
-    # Подключение к RabbitMQ и запуск consumer
+    # Секции на ближайшие дни должны существовать до приёма первых логов,
+    # иначе записи попадут в секцию по умолчанию
     try:
-        await consumer.connect()
-        logger.info("RabbitMQ consumer connected and running")
+        await maintain_partitions(
+            engine,
+            settings.LOG_PARTITION_PREMAKE_DAYS,
+            settings.LOG_RETENTION_DAYS,
+        )
     except Exception as e:
-        logger.error(f"Failed to start RabbitMQ consumer: {e}")
-        # В зависимости от требований можно либо остановить приложение, либо продолжить работу
+        logger.error(f"Failed to prepare log partitions: {e}")
+    partitions_task = asyncio.create_task(
+        run_partition_maintenance(
+            engine,
+            settings.LOG_PARTITION_PREMAKE_DAYS,
+            settings.LOG_RETENTION_DAYS,
+            settings.LOG_PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+        )
+    )
+    
+    # Подключение к RabbitMQ и запуск consumer (если логи не пишут отдельные воркеры)
+    if settings.LOG_CONSUMER_IN_API:
+        try:
+            await consumer.connect()
+            logger.info("RabbitMQ consumer connected and running")
+        except Exception as e:
+            logger.error(f"Failed to start RabbitMQ consumer: {e}")
+            # В зависимости от требований можно либо остановить приложение, либо продолжить работу
+    else:
+        logger.info("RabbitMQ consumer disabled: logs are ingested by app.worker.main")
+
+    # Подписка на записанные логи всех процессов для GET /logs/stream
+    try:
+        await relay.connect()
+    except Exception as e:
+        logger.error(f"Failed to start log stream relay: {e}")
     
     yield
     
     # Shutdown
     logger.info("Shutting down Logging Service...")
+    partitions_task.cancel()
     
     # Отключаемся от RabbitMQ
+    await relay.disconnect()
     await consumer.disconnect()
     
     # Закрываем соединения с БД
@@ -70,6 +108,64 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Метрики Prometheus на /metrics
+metrics_registry = setup_metrics(app, engine)
+metrics_registry.register_collector(
+    lambda: [
+        *gauges("db_pool", "DB connection pool", pool_stats(engine)),
+        *gauges("log_consumer", "RabbitMQ log consumer", consumer.stats()),
+        *gauges("logs_total_cache", "GET /logs total cache", total_cache.stats()),
+        *gauges("log_stream", "GET /logs/stream subscribers", broadcaster.stats()),
+    ]
+)
+
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    """
+    Преобразует некорректный курсор пагинации в ответ 400.
+
+    Args:
+        request: Входящий запрос
+        exc: Ошибка разбора курсора
+
+    Returns:
+        JSONResponse: Ответ с описанием ошибки
+    """
+    return JSONResponse(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        content={"detail": str(exc)},
+    )
+
+
+async def consumer_check() -> dict:
+    """
+    Проверяет, что consumer запущен, и возвращает глубину очереди логов.
+
+    Returns:
+        dict: Глубина очереди и состояние пакетной записи
+
+    Raises:
+        CheckFailed: Если consumer остановлен или очередь слишком длинная
+    """
+    if not consumer.is_running:
+        raise CheckFailed("consumer is not running")
+    depth = await consumer.queue_depth()
+    if settings.READYZ_MAX_QUEUE_DEPTH and depth > settings.READYZ_MAX_QUEUE_DEPTH:
+        raise CheckFailed(f"queue depth {depth} exceeds {settings.READYZ_MAX_QUEUE_DEPTH}")
+    return {"queue_depth": depth, **consumer.stats()}
+
+
+# Проверки готовности /readyz и живости /livez
+readiness_probe = ReadinessProbe(
+    timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS,
+    cache_seconds=settings.HEALTH_CHECK_CACHE_SECONDS,
+)
+readiness_probe.add("database", database_check(engine))
+if settings.LOG_CONSUMER_IN_API:
+    readiness_probe.add("rabbitmq_consumer", consumer_check)
+setup_health(app, readiness_probe)
+
 # Подключение роутеров
 app.include_router(logs_router)
 
@@ -100,6 +196,7 @@ async def health_check():
     return {
         "status": "healthy",
         "rabbitmq_connected": consumer.is_running,
+        "db_pool": pool_stats(engine),
     }
 
 
@@ -25,6 +25,10 @@ class LogEntryResponse(LogEntryBase):
 
     id: UUID
     created_at: datetime
+    snippet: str | None = Field(
+        None,
+        description="Фрагмент сообщения с совпадениями в <mark> (только при поиске q, HTML экранирован)",
+    )
 
     class Config:
         """Конфигурация Pydantic."""
@@ -36,5 +40,25 @@ class LogEntryListResponse(BaseModel):
     """Схема ответа со списком логов."""
 
     logs: list[LogEntryResponse]
-    total: int
+    total: int | None = Field(None, description="Общее количество записей (точное или оценка)")
+    next_cursor: str | None = Field(None, description="Курсор следующей страницы")
 
+
+class LogStatsBucket(BaseModel):
+    """Количество логов сервиса за один интервал."""
+
+    bucket: datetime = Field(..., description="Начало интервала")
+    service_name: str
+    total: int = Field(..., description="Количество логов за интервал")
+    by_level: dict[int, int] = Field(..., description="Количество логов по уровням (0-3)")
+    error_rate: float = Field(..., description="Доля логов уровня ERROR (3)")
+
+
+class LogStatsResponse(BaseModel):
+    """Схема ответа со статистикой логов."""
+
+    bucket: str = Field(..., description="Размер интервала")
+    stats: list[LogStatsBucket] = Field(
+        ...,
+        description="Интервалы с логами по возрастанию времени; интервалы без логов не возвращаются",
+    )
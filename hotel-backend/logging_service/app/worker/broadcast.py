@@ -0,0 +1,308 @@
+"""
+Рассылка записанных логов подписчикам GET /logs/stream.
+
+Процессы, записывающие логи (consumer в API и воркеры), публикуют каждую
+записанную пачку в fanout exchange RABBITMQ_LOG_STREAM_EXCHANGE. Каждый
+процесс HTTP API получает их через собственную очередь (LogStreamRelay) и
+раздаёт своим подписчикам, поэтому подписчик любой реплики видит все логи.
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterable
+from uuid import uuid4
+
+from aio_pika import DeliveryMode, ExchangeType, IncomingMessage, Message, connect_robust
+from aio_pika.abc import AbstractChannel, AbstractConnection, AbstractExchange
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(eq=False)
+class LogSubscription:
+    """
+    Подписка на поток логов с серверными фильтрами.
+
+    Attributes:
+        level: Фильтр по уровню лога (None — все уровни)
+        service_name: Фильтр по имени сервиса (None — все сервисы)
+        queue: Ограниченная очередь готовых SSE-событий
+        dropped: Подписка отключена из-за переполнения очереди
+    """
+
+    level: int | None
+    service_name: str | None
+    queue: asyncio.Queue[str] = field(default_factory=asyncio.Queue)
+    dropped: bool = False
+
+    def matches(self, row: dict[str, Any]) -> bool:
+        """Проверяет, проходит ли запись фильтры подписки."""
+        return (self.level is None or row["level"] == self.level) and (
+            self.service_name is None or row["service_name"] == self.service_name
+        )
+
+
+def format_event(row: dict[str, Any]) -> str:
+    """
+    Форматирует запись лога как SSE-событие log.
+
+    Args:
+        row: Значения колонок записи logs
+
+    Returns:
+        str: Событие с id записи и JSON в data
+    """
+    data = json.dumps(
+        {
+            "id": str(row["id"]),
+            "level": row["level"],
+            "message": row["message"],
+            "service_name": row["service_name"],
+            "created_at": row["created_at"].isoformat(),
+        },
+        ensure_ascii=False,
+    )
+    return f"id: {row['id']}\nevent: log\ndata: {data}\n\n"
+
+
+def encode_rows(rows: Iterable[dict[str, Any]]) -> bytes:
+    """
+    Сериализует записанные логи для публикации в exchange потока.
+
+    Args:
+        rows: Значения колонок записанных логов
+
+    Returns:
+        bytes: JSON-массив записей
+    """
+    return json.dumps(
+        [
+            {
+                "id": str(row["id"]),
+                "level": row["level"],
+                "message": row["message"],
+                "service_name": row["service_name"],
+                "created_at": row["created_at"].isoformat(),
+            }
+            for row in rows
+        ],
+        ensure_ascii=False,
+    ).encode()
+
+
+def decode_rows(body: bytes) -> list[dict[str, Any]]:
+    """
+    Восстанавливает записи логов из сообщения exchange потока.
+
+    Args:
+        body: JSON-массив записей
+
+    Returns:
+        list[dict[str, Any]]: Значения колонок записей
+    """
+    rows = json.loads(body)
+    for row in rows:
+        row["created_at"] = datetime.fromisoformat(row["created_at"])
+    return rows
+
+
+async def declare_stream_exchange(channel: AbstractChannel) -> AbstractExchange:
+    """
+    Объявляет fanout exchange потока логов.
+
+    Args:
+        channel: Канал для объявления
+
+    Returns:
+        AbstractExchange: Exchange RABBITMQ_LOG_STREAM_EXCHANGE
+    """
+    return await channel.declare_exchange(
+        settings.RABBITMQ_LOG_STREAM_EXCHANGE,
+        ExchangeType.FANOUT,
+        durable=True,
+    )
+
+
+async def publish_rows(exchange: AbstractExchange | None, rows: list[dict[str, Any]]):
+    """
+    Публикует записанные логи в exchange потока.
+
+    Публикация без подтверждений и без сохранения на диск: поток — только
+    оповещение, записи уже в БД. Ошибка публикации не влияет на запись логов.
+
+    Args:
+        exchange: Exchange потока (None — публикация не выполняется)
+        rows: Значения колонок записанных логов
+    """
+    if exchange is None or not rows:
+        return
+    try:
+        await exchange.publish(
+            Message(body=encode_rows(rows), delivery_mode=DeliveryMode.NOT_PERSISTENT),
+            routing_key="",
+        )
+    except Exception as e:
+        logger.warning(f"Failed to publish logs to stream exchange: {e}")
+
+
+class LogBroadcaster:
+    """
+    Раздаёт записанные логи подписчикам.
+
+    У каждого подписчика своя ограниченная очередь. Публикация не ждёт
+    подписчиков: если очередь переполнена, подписчик отключается, и запись
+    логов не замедляется из-за медленного клиента.
+    """
+
+    def __init__(self, queue_size: int, max_subscribers: int):
+        """
+        Инициализация рассылки.
+
+        Args:
+            queue_size: Размер очереди событий одного подписчика
+            max_subscribers: Максимальное число подписчиков
+        """
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscriptions: set[LogSubscription] = set()
+        self._dropped_total = 0
+
+    def subscribe(self, level: int | None = None, service_name: str | None = None) -> LogSubscription | None:
+        """
+        Регистрирует подписчика.
+
+        Args:
+            level: Фильтр по уровню лога
+            service_name: Фильтр по имени сервиса
+
+        Returns:
+            LogSubscription | None: Подписка или None, если достигнут лимит подписчиков
+        """
+        if len(self._subscriptions) >= self.max_subscribers:
+            return None
+        subscription = LogSubscription(
+            level=level,
+            service_name=service_name,
+            queue=asyncio.Queue(maxsize=self.queue_size),
+        )
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LogSubscription):
+        """Удаляет подписчика."""
+        self._subscriptions.discard(subscription)
+
+    def publish(self, rows: Iterable[dict[str, Any]]):
+        """
+        Отправляет записи подписчикам, фильтры которых они проходят.
+
+        Каждая запись форматируется один раз для всех подписчиков.
+
+        Args:
+            rows: Значения колонок записанных логов
+        """
+        if not self._subscriptions:
+            return
+        for row in rows:
+            event = None
+            for subscription in list(self._subscriptions):
+                if not subscription.matches(row):
+                    continue
+                if event is None:
+                    event = format_event(row)
+                try:
+                    subscription.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    subscription.dropped = True
+                    self._subscriptions.discard(subscription)
+                    self._dropped_total += 1
+                    logger.warning("Log stream subscriber dropped: queue is full")
+
+    def stats(self) -> dict[str, int]:
+        """
+        Возвращает состояние рассылки.
+
+        Returns:
+            dict[str, int]: Текущие подписчики и отключённые за всё время
+        """
+        return {
+            "subscribers": len(self._subscriptions),
+            "dropped_total": self._dropped_total,
+        }
+
+
+class LogStreamRelay:
+    """
+    Получает записанные логи всех процессов и передаёт их в рассылку.
+
+    Процесс привязывает к exchange потока собственную эксклюзивную очередь,
+    которая удаляется при отключении. Очередь ограничена: если процесс не
+    успевает разбирать сообщения, старые пачки отбрасываются, и запись
+    логов не замедляется.
+    """
+
+    def __init__(self, target: LogBroadcaster, queue_size: int):
+        """
+        Инициализация ретранслятора.
+
+        Args:
+            target: Рассылка процесса
+            queue_size: Максимум пачек в очереди процесса
+        """
+        self.target = target
+        self.queue_size = queue_size
+        self.connection: AbstractConnection | None = None
+        self.is_running = False
+
+    async def connect(self):
+        """Подключение к RabbitMQ и подписка на exchange потока."""
+        self.connection = await connect_robust(settings.RABBITMQ_URL)
+        channel = await self.connection.channel()
+        exchange = await declare_stream_exchange(channel)
+        # Имя задаётся явно: robust-соединение переобъявит очередь после разрыва
+        queue = await channel.declare_queue(
+            f"{settings.RABBITMQ_LOG_STREAM_EXCHANGE}.{uuid4().hex}",
+            exclusive=True,
+            auto_delete=True,
+            arguments={"x-max-length": self.queue_size, "x-overflow": "drop-head"},
+        )
+        await queue.bind(exchange)
+        await queue.consume(self.on_message, no_ack=True)
+        self.is_running = True
+        logger.info(f"Log stream relay bound to exchange '{settings.RABBITMQ_LOG_STREAM_EXCHANGE}'")
+
+    async def on_message(self, message: IncomingMessage):
+        """
+        Передаёт пачку записанных логов подписчикам процесса.
+
+        Args:
+            message: Сообщение с JSON-массивом записей
+        """
+        try:
+            rows = decode_rows(message.body)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Failed to parse log stream message: {e}")
+            return
+        self.target.publish(rows)
+
+    async def disconnect(self):
+        """Отключение от RabbitMQ."""
+        self.is_running = False
+        if self.connection and not self.connection.is_closed:
+            await self.connection.close()
+        self.connection = None
+
+
+# Глобальный экземпляр рассылки процесса HTTP API
+broadcaster = LogBroadcaster(
+    queue_size=settings.LOG_STREAM_QUEUE_SIZE,
+    max_subscribers=settings.LOG_STREAM_MAX_SUBSCRIBERS,
+)
+
+# Источник рассылки: логи, записанные всеми процессами
+relay = LogStreamRelay(broadcaster, queue_size=settings.LOG_STREAM_QUEUE_SIZE)
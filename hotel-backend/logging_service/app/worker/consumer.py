@@ -1,103 +1,431 @@
 """RabbitMQ consumer для обработки логов."""
 
+import asyncio
 import json
 import logging
-from datetime import datetime
+from contextlib import suppress
+from datetime import datetime, timezone
+from typing import Any
+from uuid import uuid4
 
-from aio_pika import IncomingMessage, connect_robust
-from aio_pika.abc import AbstractConnection, AbstractChannel
-from sqlalchemy.ext.asyncio import AsyncSession
+from aio_pika import ExchangeType, IncomingMessage, connect_robust
+from aio_pika.abc import AbstractConnection, AbstractChannel, AbstractExchange
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
 
 from app.core.config import settings
+from app.db.rollups import RollupCounter
 from app.db.session import AsyncSessionLocal
+from app.worker.broadcast import declare_stream_exchange, publish_rows
 from common.models import LogEntry
 from app.schemas.log import LogEntryCreate
 
 logger = logging.getLogger(__name__)
 
+# Классы SQLSTATE временных ошибок: соединение, откат транзакции (deadlock,
+# serialization failure), нехватка ресурсов, вмешательство оператора
+TRANSIENT_SQLSTATE_CLASSES = ("08", "40", "53", "57")
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Проверяет, вызвана ли ошибка записи состоянием БД, а не данными.
+
+    Сообщения с временной ошибкой возвращаются в очередь; сообщения, которые
+    БД отвергает из-за содержимого, повторять бесполезно.
+
+    Args:
+        error: Исключение при записи
+
+    Returns:
+        bool: True для ошибок соединения, пула и отката транзакции
+    """
+    if isinstance(error, (OSError, asyncio.TimeoutError, PoolTimeoutError, OperationalError, InterfaceError)):
+        return True
+    if isinstance(error, DBAPIError):
+        if error.connection_invalidated:
+            return True
+        sqlstate = getattr(error.orig, "sqlstate", None) or ""
+        return sqlstate[:2] in TRANSIENT_SQLSTATE_CLASSES
+    return False
+
+
+def sharding_enabled() -> bool:
+    """
+    Включено ли шардирование очереди логов по service_name.
+
+    Требует плагина rabbitmq_consistent_hash_exchange в RabbitMQ.
+    """
+    return bool(settings.RABBITMQ_LOG_EXCHANGE) and settings.LOG_SHARDS > 0
+
+
+def shard_queue_name(shard: int) -> str:
+    """Имя очереди шарда."""
+    return f"{settings.RABBITMQ_QUEUE}.shard-{shard}"
+
 
 class RabbitMQConsumer:
-    """Класс для работы с RabbitMQ consumer."""
+    """
+    Класс для работы с RabbitMQ consumer.
+
+    Consumer открывает channels каналов с prefetch RABBITMQ_PREFETCH_COUNT
+    на каждом. Несколько процессов с одинаковыми настройками читают общую
+    очередь как конкурирующие потребители. При шардировании каждый канал
+    дополнительно читает свою часть очередей шардов: шард s достаётся
+    каналу s % (process_count * channels) процесса process_index.
+    """
+
+    def __init__(self, process_index: int = 0, process_count: int = 1, channels: int = 1):
+        """
+        Инициализация consumer.
 
-    def __init__(self):
-        """Инициализация consumer."""
+        Args:
+            process_index: Номер процесса воркера (0..process_count-1)
+            process_count: Число процессов воркера
+            channels: Число каналов в процессе
+        """
+        self.process_index = process_index
+        self.process_count = process_count
+        self.channels_count = max(1, channels)
         self.connection: AbstractConnection | None = None
         self.channel: AbstractChannel | None = None
+        self.channels: list[AbstractChannel] = []
         self.is_running = False
+        # Exchange, в который публикуются записанные логи для GET /logs/stream
+        self.stream_exchange: AbstractExchange | None = None
+
+        # Состояние пакетного режима
+        self._pending: list[tuple[IncomingMessage, dict[str, Any]]] = []
+        self._inflight: set[asyncio.Task] = set()
+        self._inflight_slots = asyncio.Semaphore(settings.LOG_MAX_INFLIGHT_BATCHES)
+        self._flush_task: asyncio.Task | None = None
+
+        # Поминутные счётчики записанных логов (log_rollups)
+        self.rollups = RollupCounter(settings.LOG_ROLLUP_FLUSH_INTERVAL_SECONDS)
+        self._rollup_task: asyncio.Task | None = None
 
     async def connect(self):
         """Подключение к RabbitMQ."""
         try:
             logger.info(f"Connecting to RabbitMQ: {settings.RABBITMQ_URL.split('@')[1] if '@' in settings.RABBITMQ_URL else 'configured'}")
             self.connection = await connect_robust(settings.RABBITMQ_URL)
-            self.channel = await self.connection.channel()
-            
-            # Объявляем очередь
-            queue = await self.channel.declare_queue(settings.RABBITMQ_QUEUE, durable=True)
-            logger.info(f"Queue '{settings.RABBITMQ_QUEUE}' declared")
-            
-            # Настраиваем обработчик сообщений
-            await queue.consume(self.process_message)
-            logger.info("RabbitMQ consumer started")
+
+            if settings.LOG_BATCH_ENABLED:
+                self._flush_task = asyncio.create_task(self._flush_loop())
+            self._rollup_task = asyncio.create_task(self.rollups.run())
+
+            for index in range(self.channels_count):
+                channel = await self.connection.channel()
+                # Ограничиваем число неподтверждённых сообщений на канале
+                await channel.set_qos(prefetch_count=settings.RABBITMQ_PREFETCH_COUNT)
+                if index == 0:
+                    await self._declare_topology(channel)
+
+                # Настраиваем обработчик сообщений
+                for queue_name in self.channel_queues(index):
+                    queue = await channel.declare_queue(queue_name, durable=True)
+                    await queue.consume(self.process_message)
+                self.channels.append(channel)
+
+            self.channel = self.channels[0]
+            logger.info(
+                f"RabbitMQ consumer started: process {self.process_index + 1}/{self.process_count}, "
+                f"{self.channels_count} channel(s), queues {self.queue_names}"
+            )
             self.is_running = True
         except Exception as e:
             logger.error(f"Failed to connect to RabbitMQ: {e}")
             raise
 
+    async def _declare_topology(self, channel: AbstractChannel):
+        """
+        Объявляет очередь логов, а при шардировании exchange и очереди всех шардов.
+
+        Очереди шардов объявляются и привязываются целиком, а не только свои:
+        сообщения маршрутизируются во все шарды ещё до запуска их воркеров.
+
+        Args:
+            channel: Канал для объявлений
+        """
+        await channel.declare_queue(settings.RABBITMQ_QUEUE, durable=True)
+        logger.info(f"Queue '{settings.RABBITMQ_QUEUE}' declared")
+        self.stream_exchange = await declare_stream_exchange(channel)
+        if not sharding_enabled():
+            return
+
+        exchange = await channel.declare_exchange(
+            settings.RABBITMQ_LOG_EXCHANGE,
+            ExchangeType.X_CONSISTENT_HASH,
+            durable=True,
+        )
+        for shard in range(settings.LOG_SHARDS):
+            queue = await channel.declare_queue(shard_queue_name(shard), durable=True)
+            # Для consistent-hash ключ привязки задаёт вес шарда
+            await queue.bind(exchange, routing_key="1")
+        logger.info(
+            f"Exchange '{settings.RABBITMQ_LOG_EXCHANGE}' declared with {settings.LOG_SHARDS} shards"
+        )
+
+    def channel_queues(self, index: int) -> list[str]:
+        """
+        Возвращает очереди, которые читает канал.
+
+        Общую очередь читают все каналы (в ней остаются сообщения издателей
+        без шардирования), очереди шардов распределяются между каналами
+        всех процессов.
+
+        Args:
+            index: Номер канала в процессе
+
+        Returns:
+            list[str]: Имена очередей
+        """
+        queues = [settings.RABBITMQ_QUEUE]
+        if sharding_enabled():
+            slot = self.process_index * self.channels_count + index
+            slots = self.process_count * self.channels_count
+            queues.extend(
+                shard_queue_name(shard)
+                for shard in range(settings.LOG_SHARDS)
+                if shard % slots == slot
+            )
+        return queues
+
+    @property
+    def queue_names(self) -> list[str]:
+        """Все очереди, которые читает процесс."""
+        return list(dict.fromkeys(
+            queue_name
+            for index in range(self.channels_count)
+            for queue_name in self.channel_queues(index)
+        ))
+
+    def stats(self) -> dict[str, int]:
+        """
+        Возвращает состояние пакетной записи.
+
+        Returns:
+            dict[str, int]: Сообщения в буфере и пакеты в процессе записи
+        """
+        return {
+            "pending_messages": len(self._pending),
+            "inflight_batches": len(self._inflight),
+            "pending_rollups": self.rollups.pending,
+        }
+
+    async def queue_depth(self) -> int:
+        """
+        Возвращает количество сообщений, ожидающих в очередях процесса.
+
+        Пассивное объявление выполняется на отдельном канале: ошибка на нём
+        не закроет канал, с которого идёт потребление.
+
+        Returns:
+            int: Количество готовых к доставке сообщений
+
+        Raises:
+            RuntimeError: Если соединение с RabbitMQ не установлено
+        """
+        if self.connection is None or self.connection.is_closed:
+            raise RuntimeError("RabbitMQ connection is not established")
+        channel = await self.connection.channel()
+        try:
+            depth = 0
+            for queue_name in self.queue_names:
+                queue = await channel.declare_queue(queue_name, passive=True)
+                depth += queue.declaration_result.message_count or 0
+            return depth
+        finally:
+            await channel.close()
+
+    @staticmethod
+    def _build_row(log_data: LogEntryCreate) -> dict[str, Any]:
+        """
+        Подготавливает данные для вставки записи лога.
+
+        Args:
+            log_data: Данные лога
+
+        Returns:
+            dict[str, Any]: Значения колонок таблицы logs
+        """
+        if log_data.timestamp:
+            # Обрабатываем различные форматы ISO timestamp
+            timestamp_str = log_data.timestamp.replace('Z', '+00:00')
+            created_at = datetime.fromisoformat(timestamp_str)
+        else:
+            created_at = datetime.now(timezone.utc)
+
+        return {
+            "id": uuid4(),
+            "level": log_data.level,
+            "message": log_data.message,
+            "service_name": log_data.service_name,
+            "created_at": created_at,
+        }
+
     async def process_message(self, message: IncomingMessage):
         """
         Обработка входящего сообщения из RabbitMQ.
-        
+
         Args:
             message: Входящее сообщение из очереди
         """
+        if settings.LOG_BATCH_ENABLED:
+            await self._enqueue_message(message)
+            return
+
         async with message.process():
             try:
                 # Парсим JSON сообщение
                 body = json.loads(message.body.decode())
                 logger.debug(f"Received message: {body}")
-                
+
                 # Валидируем данные через Pydantic
                 log_data = LogEntryCreate(**body)
-                
+
                 # Сохраняем в базу данных
                 await self.save_log_to_db(log_data)
-                
+
             except json.JSONDecodeError as e:
                 logger.error(f"Failed to parse JSON message: {e}")
             except Exception as e:
                 logger.error(f"Failed to process message: {e}")
 
+    async def _enqueue_message(self, message: IncomingMessage):
+        """
+        Добавляет сообщение в текущую пачку (пакетный режим).
+
+        Сообщение подтверждается только после записи всей пачки в БД.
+
+        Args:
+            message: Входящее сообщение из очереди
+        """
+        try:
+            body = json.loads(message.body.decode())
+            row = self._build_row(LogEntryCreate(**body))
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse JSON message: {e}")
+            await message.ack()
+            return
+        except Exception as e:
+            logger.error(f"Failed to process message: {e}")
+            await message.ack()
+            return
+
+        self._pending.append((message, row))
+        if len(self._pending) >= settings.LOG_BATCH_SIZE:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        """Отправляет накопленную пачку на запись в фоне."""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._write_batch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _flush_loop(self):
+        """Сбрасывает неполную пачку по истечении интервала."""
+        interval = settings.LOG_FLUSH_INTERVAL_MS / 1000
+        while True:
+            await asyncio.sleep(interval)
+            self._flush_pending()
+
+    async def _write_batch(self, batch: list[tuple[IncomingMessage, dict[str, Any]]]):
+        """
+        Записывает пачку логов и подтверждает сообщения.
+
+        Сообщения, которые БД отвергает, отклоняются без возврата в очередь
+        (попадают в dead-letter exchange, если он задан политикой очереди).
+        При временной ошибке БД незаписанные сообщения возвращаются в очередь.
+
+        Args:
+            batch: Пары (сообщение, данные для вставки)
+        """
+        async with self._inflight_slots:
+            saved, rejected, requeued = await self._save_bisect(batch)
+            await asyncio.gather(
+                *(message.ack() for message, _ in saved),
+                *(message.reject(requeue=False) for message, _ in rejected),
+                *(message.nack(requeue=True) for message, _ in requeued),
+                return_exceptions=True,
+            )
+            if saved:
+                self.rollups.add(row for _, row in saved)
+                await publish_rows(self.stream_exchange, [row for _, row in saved])
+                logger.debug(f"Batch of {len(saved)} logs saved")
+
+    async def _save_bisect(
+        self,
+        batch: list[tuple[IncomingMessage, dict[str, Any]]],
+    ) -> tuple[list, list, list]:
+        """
+        Записывает пачку, при ошибке данных — делением пополам.
+
+        Одна запись, которую отвергает БД (например, с символом \\x00), не
+        блокирует остальные: пачка делится, пока ошибочные записи не будут
+        найдены по одной. После временной ошибки запись прекращается.
+
+        Args:
+            batch: Пары (сообщение, данные для вставки)
+
+        Returns:
+            tuple[list, list, list]: Записанные, отвергнутые и отложенные пары
+        """
+        try:
+            await self.save_logs_batch([row for _, row in batch])
+            return batch, [], []
+        except Exception as e:
+            if is_transient_error(e):
+                logger.error(f"Failed to save batch of {len(batch)} logs, requeueing: {e}")
+                return [], [], batch
+            if len(batch) == 1:
+                logger.error(f"Rejecting log that cannot be saved: {e}")
+                return [], batch, []
+
+        middle = len(batch) // 2
+        saved, rejected, requeued = await self._save_bisect(batch[:middle])
+        if requeued:
+            return saved, rejected, requeued + batch[middle:]
+        right_saved, right_rejected, requeued = await self._save_bisect(batch[middle:])
+        return saved + right_saved, rejected + right_rejected, requeued
+
+    async def save_logs_batch(self, rows: list[dict[str, Any]]):
+        """
+        Сохранение пачки логов одним многострочным INSERT.
+
+        Args:
+            rows: Значения колонок для каждой записи
+        """
+        async with AsyncSessionLocal() as session:
+            try:
+                await session.execute(insert(LogEntry), rows)
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
     async def save_log_to_db(self, log_data: LogEntryCreate):
         """
         Сохранение лога в базу данных.
-        
+
         Args:
             log_data: Данные лога для сохранения
         """
         async with AsyncSessionLocal() as session:
             try:
-                # Подготавливаем данные для создания записи
-                log_kwargs = {
-                    "level": log_data.level,
-                    "message": log_data.message,
-                    "service_name": log_data.service_name,
-                }
-                
-                # Парсим timestamp если он указан
-                if log_data.timestamp:
-                    # Обрабатываем различные форматы ISO timestamp
-                    timestamp_str = log_data.timestamp.replace('Z', '+00:00')
-                    log_kwargs["created_at"] = datetime.fromisoformat(timestamp_str)
-                # Если timestamp не указан, БД установит created_at автоматически через server_default
-                
                 # Создаем запись в БД
-                log_entry = LogEntry(**log_kwargs)
-                
+                row = self._build_row(log_data)
+                log_entry = LogEntry(**row)
+
                 session.add(log_entry)
                 await session.commit()
                 logger.debug(f"Log saved: {log_entry.id}")
-                
+                self.rollups.add([row])
+                await publish_rows(self.stream_exchange, [row])
+
             except Exception as e:
                 await session.rollback()
                 logger.error(f"Failed to save log to database: {e}")
@@ -105,12 +433,36 @@ class RabbitMQConsumer:
 
     async def disconnect(self):
         """Отключение от RabbitMQ."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+
+        # Дописываем незавершённые пачки, пока канал ещё открыт для подтверждений
+        self._flush_pending()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        # Сбрасываем счётчики записанных пачек
+        if self._rollup_task is not None:
+            self._rollup_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._rollup_task
+            self._rollup_task = None
+        try:
+            await self.rollups.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush log rollups: {e}")
+
         if self.connection and not self.connection.is_closed:
             await self.connection.close()
             logger.info("RabbitMQ connection closed")
+        self.channels = []
+        self.channel = None
+        self.stream_exchange = None
         self.is_running = False
 
 
-# Глобальный экземпляр consumer
-consumer = RabbitMQConsumer()
-
+# Глобальный экземпляр consumer HTTP API (используется при LOG_CONSUMER_IN_API)
+consumer = RabbitMQConsumer(channels=settings.LOG_CONSUMER_CHANNELS)
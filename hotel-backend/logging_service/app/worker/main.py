@@ -0,0 +1,115 @@
+"""
+Воркер записи логов из RabbitMQ, отдельный от HTTP API.
+
+Запускает LOG_WORKER_PROCESSES процессов, в каждом RabbitMQConsumer с
+LOG_CONSUMER_CHANNELS каналами. Приём логов и обслуживание HTTP-запросов
+масштабируются независимо: API можно запустить с LOG_CONSUMER_IN_API=false.
+
+Запуск (из каталога logging_service):
+    python -m app.worker.main
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import signal
+import sys
+
+from app.core.config import settings
+from app.db.session import engine
+from app.worker.consumer import RabbitMQConsumer
+
+logger = logging.getLogger(__name__)
+
+
+def configure_logging(process_name: str):
+    """Настраивает логирование процесса воркера."""
+    logging.basicConfig(
+        level=logging.INFO if not settings.DEBUG else logging.DEBUG,
+        format=f"%(asctime)s - {process_name} - %(name)s - %(levelname)s - %(message)s",
+    )
+
+
+async def consume(process_index: int, process_count: int):
+    """
+    Читает логи из RabbitMQ до получения SIGTERM или SIGINT.
+
+    Args:
+        process_index: Номер процесса
+        process_count: Число процессов воркера
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+
+    consumer = RabbitMQConsumer(
+        process_index=process_index,
+        process_count=process_count,
+        channels=settings.LOG_CONSUMER_CHANNELS,
+    )
+    try:
+        await consumer.connect()
+        await stop.wait()
+        logger.info("Stopping worker...")
+    finally:
+        # Дописываем накопленные пачки и подтверждаем их до закрытия соединения
+        await consumer.disconnect()
+        await engine.dispose()
+
+
+def run_worker(process_index: int, process_count: int):
+    """
+    Точка входа процесса воркера.
+
+    Args:
+        process_index: Номер процесса
+        process_count: Число процессов воркера
+    """
+    configure_logging(f"log-worker-{process_index}")
+    asyncio.run(consume(process_index, process_count))
+
+
+def main():
+    """Запускает процессы воркера и ждёт их завершения."""
+    process_count = settings.LOG_WORKER_PROCESSES
+    if process_count == 1:
+        run_worker(0, 1)
+        return
+
+    configure_logging("log-worker")
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_worker, args=(index, process_count), name=f"log-worker-{index}")
+        for index in range(process_count)
+    ]
+    for process in processes:
+        process.start()
+    logger.info(f"Started {process_count} log worker processes")
+
+    stopping = False
+
+    def stop_all(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, stop_all)
+    signal.signal(signal.SIGINT, stop_all)
+
+    # Падение одного процесса останавливает всех: перезапуск выполняет оркестратор
+    exit_code = 0
+    while any(process.is_alive() for process in processes):
+        for process in processes:
+            process.join(timeout=1)
+            if not stopping and process.exitcode not in (None, 0):
+                logger.error(f"{process.name} exited with code {process.exitcode}")
+                exit_code = 1
+                stop_all(None, None)
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Бенчмарк поиска свободных комнат отеля.
+
+Создаёт временный отель с большим количеством комнат и бронирований и
+сравнивает два способа найти свободные комнаты на даты:
+
+* N+1 — список комнат отеля и отдельная проверка доступности каждой комнаты;
+* один запрос с anti-join по бронированиям (как в GET /hotels/{id}/availability).
+
+Запуск:
+    BOOKING_DATABASE_URL=... python scripts/bench_availability.py [rooms] [repeats]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from uuid import uuid4
+
+from dotenv import load_dotenv
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# Добавляем путь к common для импорта моделей
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.models import Booking, Hotel, Room
+
+# Загрузка переменных окружения из .env файла
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path)
+
+BASE_DATE = date(2030, 1, 1)
+
+
+async def seed_hotel(session: AsyncSession, rooms_count: int):
+    """Создаёт отель с комнатами и случайными бронированиями."""
+    hotel_id = uuid4()
+    await session.execute(
+        insert(Hotel).values(
+            id=hotel_id,
+            name="Benchmark Hotel",
+            location="Benchmark",
+            description="Временный отель для бенчмарка",
+        )
+    )
+
+    room_ids = [uuid4() for _ in range(rooms_count)]
+    await session.execute(
+        insert(Room),
+        [
+            {
+                "id": room_id,
+                "hotel_id": hotel_id,
+                "room_number": f"{number:05d}",
+                "room_type": number % 3 + 1,
+                "price_per_night": Decimal(1000 + number % 50 * 100),
+            }
+            for number, room_id in enumerate(room_ids)
+        ],
+    )
+
+    # На каждую комнату — несколько непересекающихся бронирований
+    bookings = []
+    for room_id in room_ids:
+        day = random.randint(0, 10)
+        for _ in range(5):
+            length = random.randint(1, 7)
+            bookings.append(
+                {
+                    "id": uuid4(),
+                    "user_id": uuid4(),
+                    "room_id": room_id,
+                    "check_in_date": BASE_DATE + timedelta(days=day),
+                    "check_out_date": BASE_DATE + timedelta(days=day + length),
+                }
+            )
+            day += length + random.randint(0, 10)
+    await session.execute(insert(Booking), bookings)
+    await session.commit()
+    return hotel_id
+
+
+async def probe_each_room(session: AsyncSession, hotel_id, check_in: date, check_out: date):
+    """Паттерн N+1: список комнат и проверка каждой комнаты отдельно."""
+    result = await session.execute(
+        select(Room).where(Room.hotel_id == hotel_id).order_by(Room.room_number)
+    )
+    free_rooms = []
+    for room in result.scalars().all():
+        conflict = await session.execute(
+            select(
+                exists().where(
+                    Booking.room_id == room.id,
+                    Booking.check_in_date < check_out,
+                    Booking.check_out_date > check_in,
+                )
+            )
+        )
+        if not conflict.scalar():
+            free_rooms.append(room)
+    return free_rooms
+
+
+async def anti_join(session: AsyncSession, hotel_id, check_in: date, check_out: date):
+    """Один запрос: комнаты отеля без пересекающихся бронирований."""
+    has_conflict = exists().where(
+        Booking.room_id == Room.id,
+        Booking.check_in_date < check_out,
+        Booking.check_out_date > check_in,
+    )
+    result = await session.execute(
+        select(Room)
+        .where(Room.hotel_id == hotel_id, ~has_conflict)
+        .order_by(Room.room_number)
+    )
+    return result.scalars().all()
+
+
+async def measure(name: str, session_factory, func, hotel_id, repeats: int):
+    """Замеряет среднее время выполнения функции поиска."""
+    check_in = BASE_DATE + timedelta(days=20)
+    check_out = check_in + timedelta(days=3)
+    timings = []
+    found = 0
+    for _ in range(repeats):
+        async with session_factory() as session:
+            started = time.perf_counter()
+            rooms = await func(session, hotel_id, check_in, check_out)
+            timings.append(time.perf_counter() - started)
+            found = len(rooms)
+    average_ms = sum(timings) / len(timings) * 1000
+    print(f"  {name:<12} {average_ms:10.1f} ms  (free rooms: {found})")
+    return average_ms
+
+
+async def main():
+    """Основная функция бенчмарка."""
+    booking_url = os.getenv("BOOKING_DATABASE_URL")
+    if not booking_url:
+        raise ValueError("BOOKING_DATABASE_URL environment variable is not set")
+
+    rooms_count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    engine = create_async_engine(booking_url, echo=False)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as session:
+        hotel_id = await seed_hotel(session, rooms_count)
+    print(f"Seeded hotel {hotel_id} with {rooms_count} rooms")
+
+    try:
+        n_plus_one = await measure("N+1 probes", session_factory, probe_each_room, hotel_id, repeats)
+        single = await measure("anti-join", session_factory, anti_join, hotel_id, repeats)
+        print(f"  speedup: x{n_plus_one / single:.1f}")
+    finally:
+        async with session_factory() as session:
+            await session.execute(delete(Hotel).where(Hotel.id == hotel_id))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,141 @@
+"""
+Бенчмарк создания бронирования: обращения к БД и задержка.
+
+Создаёт временный отель с комнатой и последовательно бронирует её на
+непересекающиеся даты двумя способами:
+    legacy  - прежний путь: SELECT комнаты, проверка пересечений, INSERT,
+              commit, refresh и повторная загрузка бронирования с комнатой;
+    service - обработчик create_booking из booking_service.
+Для каждого способа печатается число обращений к БД на одно бронирование
+(запросы, BEGIN и COMMIT; pre-ping пула не учитывается) и задержка p50/p99.
+
+Запуск:
+    BOOKING_DATABASE_URL=... python scripts/bench_create_booking.py [bookings]
+"""
+
+import asyncio
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from uuid import uuid4
+
+from dotenv import load_dotenv
+
+# Загрузка переменных окружения из .env файла
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path)
+
+# Добавляем пути к common и booking_service для импорта моделей и обработчика
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "booking_service"))
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, event, exists, select
+from sqlalchemy.orm import selectinload
+
+from app.api.routes_bookings import create_booking
+from app.db.session import AsyncSessionLocal, engine
+from app.dependencies import CurrentUser
+from app.schemas.booking import BookingCreate, BookingResponse
+from common.models import Booking, Hotel, Room
+
+# Счётчик обращений к БД
+round_trips = 0
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def count_statement(*args):
+    """Считает выполненные запросы."""
+    global round_trips
+    round_trips += 1
+
+
+@event.listens_for(engine.sync_engine, "begin")
+@event.listens_for(engine.sync_engine, "commit")
+def count_transaction_control(conn):
+    """Считает BEGIN и COMMIT (в режиме AUTOCOMMIT драйвер их не отправляет)."""
+    global round_trips
+    if conn.get_execution_options().get("isolation_level") != "AUTOCOMMIT":
+        round_trips += 1
+
+
+async def legacy_create_booking(booking_data: BookingCreate, db, current_user) -> BookingResponse:
+    """Прежний путь создания бронирования (для сравнения)."""
+    room = (await db.execute(select(Room).where(Room.id == booking_data.room_id))).scalar_one_or_none()
+    if room is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Room not found")
+    conflict = exists().where(
+        Booking.room_id == booking_data.room_id,
+        Booking.check_in_date < booking_data.check_out_date,
+        Booking.check_out_date > booking_data.check_in_date,
+    )
+    if (await db.execute(select(conflict))).scalar():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Room is not available")
+    booking = Booking(user_id=current_user.id, **booking_data.model_dump())
+    db.add(booking)
+    await db.commit()
+    await db.refresh(booking)
+    result = await db.execute(
+        select(Booking).where(Booking.id == booking.id).options(selectinload(Booking.room))
+    )
+    return BookingResponse.model_validate(result.scalar_one())
+
+
+def percentile(values: list[float], share: float) -> float:
+    """Возвращает перцентиль в миллисекундах."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(len(ordered) * share))
+    return ordered[index] * 1000
+
+
+async def run(name: str, handler, room_id, first_day: date, bookings: int):
+    """Создаёт бронирования последовательно и печатает статистику."""
+    global round_trips
+    user = CurrentUser(user_id=uuid4())
+    timings = []
+    round_trips = 0
+    for offset in range(bookings):
+        check_in = first_day + timedelta(days=2 * offset)
+        booking_data = BookingCreate(
+            room_id=room_id,
+            check_in_date=check_in,
+            check_out_date=check_in + timedelta(days=1),
+        )
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            await handler(booking_data, db, user)
+            timings.append(time.perf_counter() - started)
+    print(
+        f"  {name:<8} round-trips/booking {round_trips / bookings:5.1f}"
+        f"  p50 {percentile(timings, 0.5):7.2f} ms"
+        f"  p99 {percentile(timings, 0.99):7.2f} ms"
+    )
+
+
+async def main():
+    """Основная функция бенчмарка."""
+    bookings = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    async with AsyncSessionLocal() as db:
+        hotel = Hotel(name="Benchmark hotel", location="Benchmark", description="bench")
+        room = Room(hotel=hotel, room_number="1", room_type=1, price_per_night=Decimal("100"))
+        db.add_all([hotel, room])
+        await db.commit()
+        hotel_id, room_id = hotel.id, room.id
+
+    try:
+        print(f"Bookings per path: {bookings}")
+        await run("legacy", legacy_create_booking, room_id, date(2100, 1, 1), bookings)
+        await run("service", create_booking, room_id, date(2200, 1, 1), bookings)
+        print("✓ Benchmark completed")
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Hotel).where(Hotel.id == hotel_id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""
+Микробенчмарк проверки JWT в booking_service.
+
+Сравнивает накладные расходы аутентификации на запрос:
+
+* без кэша — полная проверка подписи и разбор токена на каждый запрос;
+* с кэшем — authenticate_token из app.dependencies (кэш по sha256 токена).
+
+Моделирует загрузку страниц, на каждой из которых один и тот же токен
+приходит в нескольких запросах подряд.
+
+Запуск:
+    python scripts/bench_jwt_cache.py [requests] [users]
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import uuid4
+
+from dotenv import load_dotenv
+
+# Добавляем пути к common и к пакету app booking_service
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "booking_service"))
+
+# Загрузка переменных окружения из .env файла
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path)
+
+from jose import jwt
+
+from app.core.config import settings
+from app.dependencies import authenticate_token, token_cache
+from app.security.jwt import decode_access_token_claims
+
+
+def make_tokens(users: int) -> list[str]:
+    """Создаёт токены для заданного количества пользователей."""
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+    return [
+        jwt.encode(
+            {"sub": str(uuid4()), "exp": expires_at},
+            settings.JWT_SECRET,
+            algorithm=settings.JWT_ALGORITHM,
+        )
+        for _ in range(users)
+    ]
+
+
+def measure(name: str, func, tokens: list[str], requests_count: int) -> float:
+    """Замеряет среднее время проверки токена на один запрос."""
+    started = time.perf_counter()
+    for i in range(requests_count):
+        if func(tokens[i % len(tokens)]) is None:
+            raise RuntimeError("Token rejected")
+    per_request_us = (time.perf_counter() - started) / requests_count * 1_000_000
+    print(f"  {name:<12} {per_request_us:8.2f} µs/request")
+    return per_request_us
+
+
+def main():
+    """Основная функция бенчмарка."""
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    tokens = make_tokens(users)
+    print(f"Requests: {requests_count}, distinct tokens: {users}")
+
+    uncached = measure("no cache", decode_access_token_claims, tokens, requests_count)
+    token_cache.clear()
+    cached = measure("cache", authenticate_token, tokens, requests_count)
+    print(f"  speedup: x{uncached / cached:.1f}")
+    print(f"  cache stats: {token_cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Нагрузочный бенчмарк входа в auth_service.
+
+Регистрирует временного пользователя и отправляет параллельные запросы
+POST /auth/login. Одновременно опрашивает GET /health, чтобы показать,
+блокирует ли bcrypt event loop сервиса: при хэшировании в пуле потоков
+задержка /health не должна расти вместе с нагрузкой на вход.
+
+Запуск (сервис должен быть запущен):
+    AUTH_URL=http://localhost:8000 python scripts/bench_login.py [requests] [concurrency]
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from uuid import uuid4
+
+from dotenv import load_dotenv
+
+# Загрузка переменных окружения из .env файла
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path)
+
+AUTH_URL = os.getenv("AUTH_URL", "http://localhost:8000").rstrip("/")
+
+
+def request(method: str, path: str, body: dict | None = None) -> tuple[int, float]:
+    """Отправляет запрос и возвращает статус ответа и время выполнения."""
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(
+        f"{AUTH_URL}{path}",
+        data=data,
+        method=method,
+        headers={"Content-Type": "application/json"},
+    )
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=60) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    return status, time.perf_counter() - started
+
+
+def percentile(values: list[float], share: float) -> float:
+    """Возвращает перцентиль в миллисекундах."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(len(ordered) * share))
+    return ordered[index] * 1000
+
+
+def report(name: str, timings: list[float]):
+    """Печатает p50/p99/max для набора замеров."""
+    if not timings:
+        print(f"  {name:<8} no samples")
+        return
+    print(
+        f"  {name:<8} p50 {percentile(timings, 0.5):8.1f} ms"
+        f"  p99 {percentile(timings, 0.99):8.1f} ms"
+        f"  max {max(timings) * 1000:8.1f} ms"
+    )
+
+
+def main():
+    """Основная функция бенчмарка."""
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    email = f"bench-{uuid4().hex[:12]}@example.com"
+    password = "bench-password"
+    status, _ = request(
+        "POST",
+        "/auth/register",
+        {"name": "Benchmark", "email": email, "password": password},
+    )
+    if status != 201:
+        print(f"✗ Failed to register benchmark user: HTTP {status}")
+        sys.exit(1)
+
+    # Фоновый опрос /health на протяжении всего теста
+    health_timings: list[float] = []
+    done = threading.Event()
+
+    def probe_health():
+        while not done.is_set():
+            _, elapsed = request("GET", "/health")
+            health_timings.append(elapsed)
+            time.sleep(0.02)
+
+    prober = threading.Thread(target=probe_health, daemon=True)
+    prober.start()
+
+    def login(_):
+        return request("POST", "/auth/login", {"email": email, "password": password})
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(login, range(requests_count)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    prober.join()
+
+    statuses = Counter(status for status, _ in results)
+    print(f"Logins: {requests_count}, concurrency: {concurrency}, statuses: {dict(statuses)}")
+    print(f"  throughput {requests_count / elapsed:.1f} logins/s")
+    report("login", [timing for status, timing in results if status == 200])
+    report("health", health_timings)
+    print(f"  note: user {email} is left in auth_db")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Проверка защиты от двойного бронирования при конкурентных запросах.
+
+Создаёт временный отель с одной комнатой и параллельно вызывает обработчик
+create_booking из booking_service для сотен пользователей на одни и те же
+даты. Ожидается, что ровно одно бронирование будет создано, а остальные
+запросы получат 400. Отдельно считается, сколько вставок отклонил exclusion
+constraint ex_bookings_room_overlap (их обработчик тоже должен превращать в
+400) и сколько раз вставка повторялась после deadlock/serialization failure.
+
+Запуск:
+    BOOKING_DATABASE_URL=... python scripts/check_booking_race.py [requests]
+"""
+
+import asyncio
+import os
+import sys
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+from uuid import uuid4
+
+from dotenv import load_dotenv
+
+# Загрузка переменных окружения из .env файла
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path)
+
+# Пул должен вмещать все параллельные запросы
+os.environ.setdefault("DB_POOL_SIZE", "50")
+os.environ.setdefault("DB_MAX_OVERFLOW", "100")
+
+# Добавляем пути к common и booking_service для импорта моделей и обработчика
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "booking_service"))
+
+from fastapi import HTTPException
+from sqlalchemy import delete, event
+
+from app.api.routes_bookings import create_booking
+from app.db.errors import EXCLUSION_VIOLATION, RETRYABLE_SQLSTATES
+from app.db.session import AsyncSessionLocal, engine
+from app.dependencies import CurrentUser
+from app.schemas.booking import BookingCreate
+from common.models import Hotel, Room
+
+# Ошибки БД, перехваченные при вставке, по SQLSTATE
+database_errors: Counter = Counter()
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def count_database_error(context):
+    """Считает ошибки БД по SQLSTATE."""
+    database_errors[getattr(context.original_exception, "sqlstate", None)] += 1
+
+
+async def try_book(room_id, start: asyncio.Event) -> str:
+    """Пытается забронировать комнату через обработчик и возвращает результат."""
+    booking_data = BookingCreate(
+        room_id=room_id,
+        check_in_date=date(2030, 6, 1),
+        check_out_date=date(2030, 6, 5),
+    )
+    await start.wait()
+    async with AsyncSessionLocal() as db:
+        try:
+            await create_booking(booking_data, db, CurrentUser(user_id=uuid4()))
+            return "created"
+        except HTTPException as e:
+            return "rejected" if e.status_code == 400 else f"http {e.status_code}"
+        except Exception as e:
+            return f"error {type(e).__name__}"
+
+
+async def main():
+    """Основная функция проверки."""
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    async with AsyncSessionLocal() as db:
+        hotel = Hotel(
+            name="Race Hotel",
+            location="Benchmark",
+            description="Временный отель для проверки гонок",
+        )
+        room = Room(hotel=hotel, room_number="1", room_type=1, price_per_night=Decimal("1000.00"))
+        db.add_all([hotel, room])
+        await db.commit()
+        hotel_id, room_id = hotel.id, room.id
+
+    try:
+        start = asyncio.Event()
+        tasks = [asyncio.create_task(try_book(room_id, start)) for _ in range(requests_count)]
+        start.set()
+        results = Counter(await asyncio.gather(*tasks))
+        exclusion_violations = database_errors[EXCLUSION_VIOLATION]
+        retries = sum(database_errors[sqlstate] for sqlstate in RETRYABLE_SQLSTATES)
+        print(f"Parallel bookings: {requests_count}, results: {dict(results)}")
+        print(f"  exclusion violations mapped to 400: {exclusion_violations}")
+        print(f"  retried after deadlock/serialization failure: {retries}")
+
+        if results["created"] != 1 or results["rejected"] != requests_count - 1:
+            print("✗ Double booking protection failed")
+            sys.exit(1)
+        if not exclusion_violations:
+            print("  (no concurrent insert reached the constraint; try more requests)")
+        print("✓ Exactly one booking created, the rest rejected with 400")
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Hotel).where(Hotel.id == hotel_id))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Проверка числа запросов к БД при получении списка отелей.
+
+Создаёт временные отели с комнатами и вызывает обработчик get_hotels из
+booking_service с выключенным кэшем каталога, считая выполненные SELECT.
+Ожидается:
+    GET /hotels/                - один SELECT (комнаты не загружаются);
+    GET /hotels/?include=rooms  - два SELECT (отели и комнаты selectinload).
+
+Запуск:
+    BOOKING_DATABASE_URL=... python scripts/check_hotel_queries.py
+"""
+
+import asyncio
+import os
+import sys
+from decimal import Decimal
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Загрузка переменных окружения из .env файла
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path)
+
+# Ответы из кэша каталога не обращаются к БД — проверяем сами запросы
+os.environ["CATALOG_CACHE_ENABLED"] = "false"
+
+# Добавляем пути к common и booking_service для импорта моделей и обработчика
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "booking_service"))
+
+from sqlalchemy import delete, event
+from starlette.requests import Request
+
+from app.api.routes_hotels import get_hotels
+from app.db.session import AsyncSessionLocal, engine
+from common.models import Hotel, Room
+
+# Выполненные SELECT
+selects: list[str] = []
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def record_select(conn, cursor, statement, parameters, context, executemany):
+    """Запоминает выполненные SELECT."""
+    if statement.lstrip().upper().startswith("SELECT"):
+        selects.append(statement)
+
+
+def make_request() -> Request:
+    """Создаёт запрос без заголовков (If-None-Match не передаётся)."""
+    return Request({"type": "http", "method": "GET", "path": "/hotels/", "headers": []})
+
+
+async def count_selects(include: str | None) -> int:
+    """Вызывает обработчик и возвращает число выполненных SELECT."""
+    async with AsyncSessionLocal() as db:
+        # Соединение берётся заранее, чтобы pre-ping пула не попал в подсчёт
+        await db.connection()
+        selects.clear()
+        await get_hotels(make_request(), db, include=include, limit=100, cursor=None)
+        return len(selects)
+
+
+async def main():
+    """Основная функция проверки."""
+    async with AsyncSessionLocal() as db:
+        hotels = [
+            Hotel(name=f"Query check hotel {index}", location="Benchmark", description="check")
+            for index in range(3)
+        ]
+        rooms = [
+            Room(hotel=hotel, room_number=str(number), room_type=1, price_per_night=Decimal("100"))
+            for hotel in hotels
+            for number in range(5)
+        ]
+        db.add_all([*hotels, *rooms])
+        await db.commit()
+        hotel_ids = [hotel.id for hotel in hotels]
+
+    try:
+        ok = True
+        for include, expected in ((None, 1), ("rooms", 2)):
+            count = await count_selects(include)
+            ok &= count == expected
+            mark = "✓" if count == expected else "✗"
+            print(f"{mark} include={include}: {count} SELECT (expected {expected})")
+            if count != expected:
+                for statement in selects:
+                    print(f"    {' '.join(statement.split())[:120]}")
+        if not ok:
+            sys.exit(1)
+    finally:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(Hotel).where(Hotel.id.in_(hotel_ids)))
+            await db.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
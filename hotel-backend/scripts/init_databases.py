@@ -14,13 +14,13 @@ from pathlib import Path
 from uuid import UUID, uuid4
 
 from dotenv import load_dotenv
-from sqlalchemy import select
+from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 # Добавляем путь к common для импорта моделей
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from common.models import Base, User, Hotel, Room, Booking, LogEntry
+from common.models import Base, User, Hotel, Room, Booking, LogEntry, LogRollup
 
 # Загрузка переменных окружения из .env файла
 env_path = Path(__file__).parent.parent / ".env"
@@ -43,8 +43,50 @@ TEST_ROOM_IDS = [
 ]
 
 
+# Добавляет запрет пересечений бронирований в уже существующую таблицу bookings
+ENSURE_BOOKINGS_EXCLUSION_SQL = """
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'ex_bookings_room_overlap'
+    ) THEN
+        ALTER TABLE bookings ADD CONSTRAINT ex_bookings_room_overlap
+            EXCLUDE USING gist (
+                room_id WITH =,
+                daterange(check_in_date, check_out_date) WITH &&
+            );
+    END IF;
+END
+$$;
+"""
+
+# Добавляет время изменения комнаты в уже существующую таблицу rooms
+ENSURE_ROOMS_UPDATED_AT_SQL = """
+ALTER TABLE rooms ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+"""
+
+# Секция по умолчанию для записей вне созданных дневных секций
+# (старая несекционированная таблица logs остаётся как есть)
+CREATE_LOGS_DEFAULT_PARTITION_SQL = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'logs'::regclass
+    ) THEN
+        CREATE TABLE IF NOT EXISTS logs_default PARTITION OF logs DEFAULT;
+    END IF;
+END
+$$;
+"""
+
+# Триграммный индекс поиска по сообщениям для уже существующей таблицы logs
+CREATE_LOGS_MESSAGE_TRGM_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS ix_logs_message_trgm ON logs USING gin (message gin_trgm_ops)
+"""
+
+
 # Используем общие модели из common.models
-# User, Hotel, Room, Booking, LogEntry уже импортированы выше
+# User, Hotel, Room, Booking, LogEntry, LogRollup уже импортированы выше
 
 
 # ============================================================================
@@ -90,7 +132,12 @@ async def init_booking_db():
     Booking.__table__.tometadata(booking_metadata, schema="public")
     
     async with engine.begin() as conn:
+        # btree_gist нужен для exclusion constraint по (room_id, daterange)
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
         await conn.run_sync(booking_metadata.create_all)
+        # create_all не меняет существующие таблицы — добавляем ограничение отдельно
+        await conn.execute(text(ENSURE_BOOKINGS_EXCLUSION_SQL))
+        await conn.execute(text(ENSURE_ROOMS_UPDATED_AT_SQL))
 
     # Вставка тестовых данных
     async with async_session() as session:
@@ -198,13 +245,21 @@ async def init_logging_db():
 
     engine = create_async_engine(logging_url, echo=False)
     
-    # Создаём метаданные только для модели LogEntry (без указания схемы, по умолчанию public)
+    # Создаём метаданные только для моделей логов (без указания схемы, по умолчанию public)
     from sqlalchemy import MetaData
     logging_metadata = MetaData()
     LogEntry.__table__.tometadata(logging_metadata)
+    LogRollup.__table__.tometadata(logging_metadata)
     
     async with engine.begin() as conn:
+        # pg_trgm нужен для триграммного индекса поиска по сообщениям
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(logging_metadata.create_all)
+        # create_all не добавляет индексы в существующую таблицу
+        await conn.execute(text(CREATE_LOGS_MESSAGE_TRGM_INDEX_SQL))
+        # Таблица logs секционирована — без секции по умолчанию вставка невозможна.
+        # Дневные секции создаёт logging_service при старте
+        await conn.execute(text(CREATE_LOGS_DEFAULT_PARTITION_SQL))
     await engine.dispose()
     print("✓ logging_db initialized")
 
@@ -92,6 +92,23 @@ const bearer = (token?: string) => {
     return t && t.trim() !== "" ? { Authorization: `Bearer ${t}` } : {};
 };
 
+// List endpoints are paginated: the next page cursor comes in X-Next-Cursor
+const PAGE_SIZE = 500;
+
+const getAllPages = async (url: string, headers: Record<string, string> = {}) => {
+    const items: any[] = [];
+    let cursor: string | undefined;
+    do {
+        const response = await bookingApi.get(url, {
+            headers,
+            params: { limit: PAGE_SIZE, ...(cursor ? { cursor } : {}) },
+        });
+        items.push(...(response.data as any[]));
+        cursor = response.headers["x-next-cursor"] || undefined;
+    } while (cursor);
+    return items;
+};
+
 // Authorization
 export async function LoginUser(email: string, password: string) {
     const { data } = await authApi.post<{ access_token: string }>("/auth/login", {
@@ -130,8 +147,8 @@ export const deleteUser = async (userId: string, token?: string) => {
 
 // Hotels
 export const getHotels = async () => {
-    const { data } = await bookingApi.get("/hotels/");
-    return (data as any[]).map(mapHotel);
+    const data = await getAllPages("/hotels/");
+    return data.map(mapHotel);
 };
 
 export const CreateHotel = async (payload: {name: string, location: string, description: string, img_url: string}, token?: string) => {
@@ -151,8 +168,8 @@ export const getRooms = async (hotelId: string) => {
     if (!hotelId) {
         return [];
     }
-    const { data } = await bookingApi.get(`/hotels/${hotelId}/rooms`);
-    return (data as any[]).map(mapRoom);
+    const data = await getAllPages(`/hotels/${hotelId}/rooms`);
+    return data.map(mapRoom);
 };
 
 export const getRoomById = async (roomId: string) => {
@@ -179,10 +196,8 @@ export const DeleteRoom = async (roomId: string, token?: string) => {
 
 // Bookings
 export const getBookings = async (token?: string) => {
-    const { data } = await bookingApi.get("/bookings/my", {
-        headers: bearer(token),
-    });
-    return (data as any[]).map(mapBooking);
+    const data = await getAllPages("/bookings/my", bearer(token));
+    return data.map(mapBooking);
 };
 
 export const createBooking = async (